@@ -34,18 +34,29 @@ Environment Variables Required:
 For more details, see README.md
 """
 
+import base64
+import bisect
+import contextvars
 import json
 import hashlib
+import heapq
 import hmac
 import os
 import re
 import html
+import math
+import random
 import secrets
 import string
 import time
 import urllib.parse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field, asdict
 from enum import Enum
+from functools import lru_cache
+from itertools import compress
+from operator import itemgetter
 from typing import Optional
 from http.server import BaseHTTPRequestHandler
 from pathlib import Path
@@ -58,6 +69,30 @@ from wordfreq import word_frequency
 from upstash_redis import Redis
 from upstash_ratelimit import Ratelimit, FixedWindow
 
+# Optional fast JSON codec for Redis payloads (stdlib json is used without it)
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+
+
+def _json_loads(data):
+    """Decode a JSON payload (str or bytes), with orjson when available."""
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    """Encode obj as a JSON string, with orjson when available."""
+    if _ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode('utf-8')
+        except orjson.JSONEncodeError:
+            pass  # e.g. ints beyond 64 bits; stdlib json handles (or rejects) them as before
+    return json.dumps(obj)
+
 # Import security modules with graceful fallback
 # These provide enhanced security features but the app can run without them
 _SECURITY_MODULES_AVAILABLE = False
@@ -480,6 +515,10 @@ def get_time_control(is_ranked: bool, preset: str = "rapid", is_quickplay: bool
 # Embedding settings
 EMBEDDING_MODEL = CONFIG.get("embedding", {}).get("model", "text-embedding-3-small")
 EMBEDDING_CACHE_SECONDS = CONFIG.get("embedding", {}).get("cache_expiry_seconds", 86400)
+EMBEDDING_L1_MAX_WORDS = 4096  # Process-local embedding cache size (float32, ~6KB per word)
+EMBEDDING_BATCH_SIZE = 512  # Max inputs per embeddings.create call (API limit is 2048)
+EMBEDDING_BATCH_TOKEN_BUDGET = 250_000  # Max estimated input tokens per call
+EMBEDDING_FETCH_CONCURRENCY = 4  # Embedding batches in flight at once
 
 # Load pre-generated themes from individual JSON files in api/themes/ directory
 def load_themes():
@@ -568,7 +607,7 @@ def load_profanity_words():
     return []
 
 
-PROFANITY_WORDS = set(load_profanity_words())
+PROFANITY_WORDS = frozenset(load_profanity_words())
 
 
 def filter_profanity(text: str) -> str:
@@ -691,6 +730,12 @@ STREAK_MILESTONE_BONUSES = {
     100: 2000, # 100 days: +2000 bonus
 }
 
+# Sorted views of the streak tables (constants, so sort once at import)
+_STREAK_MULT_SORTED = tuple(sorted(STREAK_MULTIPLIERS.items()))
+_STREAK_MILESTONE_SORTED_KEYS = tuple(sorted(STREAK_MILESTONE_BONUSES))
+_STREAK_THRESHOLDS = tuple(t for t, _ in _STREAK_MULT_SORTED)
+_STREAK_MULTS = tuple(m for _, m in _STREAK_MULT_SORTED)
+
 # ============== DAILY QUESTS / ECONOMY ==============
 #
 # These fields live on authenticated (Google) user records stored in Redis as JSON.
@@ -838,6 +883,20 @@ AI_MISTAKE_CONFIG = {
 }
 
 # AI Chat messages for different situations
+# Chance to chat on a trigger, by difficulty (higher difficulties are more stoic)
+AI_CHAT_CHANCE = {
+    "rookie": 0.6,
+    "analyst": 0.45,
+    "field-agent": 0.35,
+    "spymaster": 0.25,
+    "ghost": 0.15,
+}
+
+AI_CHAT_PERSONALITY_MULT = {
+    "chaotic": 1.5,
+    "cautious": 0.7,
+}
+
 AI_CHAT_MESSAGES = {
     "near_miss": [
         "So close!", "Hmm interesting...", "👀", "Getting warmer...",
@@ -971,11 +1030,20 @@ AI_DIFFICULTY_CONFIG = {
         "always_change_on_elimination": True,
         "tracks_opponent_patterns": True,
         "uses_information_gain": True,
+        "belief_prune_eps": 1e-6,            # Drop belief entries below this posterior
+        "belief_min_words": 10,              # ...but always keep this many top words
     },
 }
 
+# Fallbacks for unknown difficulty/personality keys (resolved once at import)
+AI_DEFAULT_DIFFICULTY_CONFIG = AI_DIFFICULTY_CONFIG.get("rookie") or {}
+AI_DEFAULT_PERSONALITY_CONFIG = AI_PERSONALITY_CONFIG["methodical"]
+AI_DEFAULT_TIMING_CONFIG = AI_TIMING_CONFIG["rookie"]
+AI_DEFAULT_MISTAKE_CONFIG = AI_MISTAKE_CONFIG["rookie"]
+
 # AI name suffixes for variety
 AI_NAME_SUFFIXES = ["Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zeta", "Eta", "Theta"]
+AI_NAME_SUFFIXES_SET = frozenset(AI_NAME_SUFFIXES)
 
 
 def generate_ai_player_id(difficulty: str) -> str:
@@ -985,17 +1053,10 @@ def generate_ai_player_id(difficulty: str) -> str:
 
 def create_ai_player(difficulty: str, existing_names: list) -> dict:
     """Create an AI player with the specified difficulty and random personality."""
-    import random
-    
-    default_cfg = AI_DIFFICULTY_CONFIG.get("rookie") or {}
-    config = AI_DIFFICULTY_CONFIG.get(difficulty, default_cfg)
+    config = AI_DIFFICULTY_CONFIG.get(difficulty, AI_DEFAULT_DIFFICULTY_CONFIG)
     
-    # Generate unique name
-    used_suffixes = set()
-    for name in existing_names:
-        for suffix in AI_NAME_SUFFIXES:
-            if suffix in name:
-                used_suffixes.add(suffix)
+    # Generate unique name (AI names are "<Prefix>-<Suffix>")
+    used_suffixes = {n.rsplit('-', 1)[-1] for n in existing_names} & AI_NAME_SUFFIXES_SET
     
     available_suffixes = [s for s in AI_NAME_SUFFIXES if s not in used_suffixes]
     suffix = available_suffixes[0] if available_suffixes else secrets.choice(AI_NAME_SUFFIXES)
@@ -1037,9 +1098,10 @@ def create_ai_player(difficulty: str, existing_names: list) -> dict:
             "badge": selected_cosmetics.get("badge", config["badge"]),
         },
         "ai_memory": {
-            "high_similarity_targets": {},  # player_id -> [(word, similarity)]
+            "high_similarity_targets": {},  # player_id -> min-heap of top 5 (similarity, word)
             "guessed_words": [],
-            "grudges": {},                   # player_id -> grudge_strength (0-1)
+            "grudges": {},                   # player_id -> {"v": grudge_strength (0-1), "t": grudge_tick at write}
+            "grudge_tick": 0,                # grudge updates so far (drives lazy decay)
             "streak": 0,                     # positive = hot streak, negative = cold streak
             "last_guess_quality": None,      # "good", "bad", "neutral"
             "adaptation_notes": {},          # player_id -> observed patterns
@@ -1055,6 +1117,369 @@ def create_ai_player(difficulty: str, existing_names: list) -> dict:
 
 # ============== NEMESIS AI FUNCTIONS ==============
 
+# Theme word order (matrix keys) -> (word_to_idx, sims) dense views, shared
+# across requests. Games on a theme usually load the same matrix, so one view
+# serves them all; a view is only reused after checking it against the game's
+# own matrix. Oldest entries are evicted first.
+THEME_SIM_VIEW_CACHE_MAX = 64
+_theme_sim_views = {}
+
+
+def _build_theme_sim_view(matrix: dict):
+    """(word_to_idx, sims) dense float64 view of a word -> {word: sim} matrix."""
+    words = list(matrix.keys())
+    word_to_idx = {w: i for i, w in enumerate(words)}
+    rows = list(matrix.values())
+    if all(list(row) == words for row in rows):
+        # Fast path: rows written by precompute_theme_similarities share the key
+        # order, so values can be copied without per-pair lookups
+        sims = np.array([list(row.values()) for row in rows], dtype=np.float64)
+    else:
+        sims = np.array(
+            [[row.get(w, np.nan) for w in words] for row in rows],
+            dtype=np.float64,
+        )
+    sims.flags.writeable = False  # Shared across requests
+    return word_to_idx, sims
+
+
+def _theme_sim_view_matches(matrix: dict, words: tuple, sims: np.ndarray) -> bool:
+    """True if a cached view holds this matrix's values (compares the first row)."""
+    first = matrix[words[0]]
+    row = np.array([first.get(w, np.nan) for w in words], dtype=sims.dtype)
+    return np.array_equal(sims[0], row, equal_nan=True)
+
+
+def _remember_theme_sim_view(words: tuple, view: tuple) -> tuple:
+    """Store a dense view in the process-local cache and return it."""
+    if words not in _theme_sim_views and len(_theme_sim_views) >= THEME_SIM_VIEW_CACHE_MAX:
+        del _theme_sim_views[next(iter(_theme_sim_views))]
+    _theme_sim_views[words] = view
+    return view
+
+
+def _theme_sim_index(game: dict):
+    """
+    Dense view of game['theme_similarity_matrix'] for vectorized lookups.
+    
+    Returns (word_to_idx, sims) where sims is a float64 (W, W) ndarray with NaN
+    for missing pairs, or (None, None) if no matrix is loaded. float64 keeps
+    values identical to the dict, so threshold checks agree with it. Views are
+    built once per theme and kept in a process-local cache (callers must
+    treat them as read-only); a cached view whose first row differs from this
+    matrix (same words, different source) is rebuilt. The lookup is also
+    memoized on the game under '_theme_sim' (stripped by save_game).
+    """
+    matrix = game.get('theme_similarity_matrix') if game else None
+    if not matrix:
+        return None, None
+    
+    cached = game.get('_theme_sim')
+    if cached is not None and cached[0] is matrix:
+        return cached[1], cached[2]
+    
+    words = tuple(matrix)
+    view = _theme_sim_views.get(words)
+    if view is None or not _theme_sim_view_matches(matrix, words, view[1]):
+        view = _remember_theme_sim_view(words, _build_theme_sim_view(matrix))
+    word_to_idx, sims = view
+    game['_theme_sim'] = (matrix, word_to_idx, sims)
+    return word_to_idx, sims
+
+
+def _secret_row_index(game: dict):
+    """
+    (players, idxs): players with a secret word, in order, and each secret's
+    row in the dense similarity view (-1 if the matrix doesn't know it).
+    
+    Cached on game['_secret_rows'] (stripped by save_game) together with the
+    secret -> players map used by _players_by_secret, and rebuilt whenever
+    any player's secret word changes.
+    """
+    word_to_idx, _ = _theme_sim_index(game)
+    word_to_idx = word_to_idx or {}
+    players = [p for p in game.get("players", []) if p.get("secret_word")]
+    key = tuple((p["id"], p["secret_word"].lower()) for p in players)
+    cached = game.get('_secret_rows')
+    if cached is not None and cached[0] == key and cached[1] is word_to_idx:
+        return cached[2], cached[3]
+    
+    idxs = np.fromiter((word_to_idx.get(secret, -1) for _, secret in key), dtype=np.intp, count=len(key))
+    by_secret = {}
+    for p, (_, secret) in zip(players, key):
+        by_secret.setdefault(secret, []).append(p)
+    game['_secret_rows'] = (key, word_to_idx, players, idxs, by_secret)
+    return players, idxs
+
+
+def _players_by_secret(game: dict) -> dict:
+    """Lowercase secret word -> players holding it (in player order); see _secret_row_index."""
+    _secret_row_index(game)
+    return game['_secret_rows'][4]
+
+
+def _alive_player_ids(game: dict):
+    """
+    (ordered_ids, id_set) of players still in the game, in player order.
+    
+    Cached on game['_alive'] (stripped by save_game) and rebuilt only when
+    the roster or any player's is_alive flag changes.
+    """
+    players = game.get("players", [])
+    flags = tuple(bool(p.get("is_alive", True)) for p in players)
+    cached = game.get('_alive')
+    if cached is not None and cached[0] is players and cached[1] == flags:
+        return cached[2], cached[3]
+    ordered = [p.get("id") for p, alive in zip(players, flags) if alive]
+    id_set = frozenset(ordered)
+    game['_alive'] = (players, flags, ordered, id_set)
+    return ordered, id_set
+
+
+def _guess_similarities(game: dict, guess_lower: str):
+    """
+    Similarity of a guess to every player's secret, from the dense matrix view.
+    
+    Returns (similarities, unresolved): player_id -> 4-dp similarity in
+    player order, and the players with a secret the matrix couldn't answer
+    for. One row gather replaces a per-player lookup loop.
+    """
+    word_to_idx, theme_sims = _theme_sim_index(game)
+    players, idxs = _secret_row_index(game)
+    guess_idx = word_to_idx.get(guess_lower) if theme_sims is not None else None
+    if guess_idx is None:
+        return {}, players
+    
+    known = idxs >= 0
+    sims = np.full(len(idxs), np.nan)
+    sims[known] = theme_sims[guess_idx, idxs[known]]
+    found = ~np.isnan(sims)
+    rounded = np.round(sims, 4).tolist()
+    similarities = {p["id"]: rounded[i] for i, p in enumerate(players) if found[i]}
+    unresolved = [p for i, p in enumerate(players) if not found[i]]
+    return similarities, unresolved
+
+
+def _theme_sim_row(game: dict, word: str, words_lower: list) -> Optional[np.ndarray]:
+    """
+    Similarities of one word against each of words_lower, from the dense view.
+    
+    All words must already be lowercase. Returns None if the word has no
+    matrix row; pairs the matrix doesn't cover are NaN.
+    """
+    word_to_idx, sims = _theme_sim_index(game)
+    if sims is None or word not in word_to_idx:
+        return None
+    idxs = np.fromiter((word_to_idx.get(w, -1) for w in words_lower), dtype=np.intp, count=len(words_lower))
+    row = sims[word_to_idx[word]][idxs]
+    row[idxs < 0] = np.nan
+    return row
+
+
+def _theme_words_lower(game: dict) -> list:
+    """
+    Theme words lowercased once, aligned with game['theme']['words'].
+    
+    Cached on game['_theme_words_lower'] for the request (stripped by save_game).
+    Themes from get_theme_words are already lowercase, in which case the word
+    list itself is returned (callers must treat it as read-only).
+    """
+    words = (game.get('theme') or {}).get('words') or []
+    cached = game.get('_theme_words_lower')
+    if cached is not None and cached[0] is words:
+        return cached[1]
+    # One C-level scan instead of a .lower() call per word
+    lowered = words if ''.join(words).islower() else [w.lower() for w in words]
+    game['_theme_words_lower'] = (words, lowered)
+    return lowered
+
+
+def _theme_embedding_index(game: dict):
+    """
+    Stacked, L2-normalized theme embeddings for vectorized cosine lookups.
+    
+    Returns (word_to_idx, unit) with unit a float16 (W, D) ndarray, or
+    (None, None) if nothing is cached. Built lazily from get_theme_embeddings
+    and kept on game['_theme_emb'] for the request (stripped by save_game).
+    Rows are normalized in float32 and then stored as float16 (the precision
+    they are cached in Redis with), halving the resident size; _cosine_matvec
+    upcasts the rows it gathers.
+    """
+    words = (game.get('theme') or {}).get('words') or []
+    cached = game.get('_theme_emb')
+    if cached is not None and cached[0] is words:
+        return cached[1], cached[2]
+    
+    embeddings = get_theme_embeddings(game)
+    if embeddings:
+        word_to_idx = {w: i for i, w in enumerate(embeddings)}
+        unit = np.asarray(list(embeddings.values()), dtype=np.float32)
+        norms = np.linalg.norm(unit, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        unit /= norms
+        unit = unit.astype(np.float16)
+    else:
+        word_to_idx, unit = None, None
+    
+    game['_theme_emb'] = (words, word_to_idx, unit)
+    return word_to_idx, unit
+
+
+def _secret_embedding_matrix(game: dict, players: list):
+    """
+    Stacked, L2-normalized secret embeddings for the given players.
+    
+    Returns (player_ids, unit) with unit a float64 (N, D) ndarray aligned with
+    player_ids; players whose embedding can't be found are left out. Cached on
+    game['_secret_emb'] (stripped by save_game) and rebuilt whenever any of
+    the players' secret words change.
+    """
+    key = tuple((p["id"], (p.get("secret_word") or "").lower()) for p in players)
+    cached = game.get('_secret_emb')
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+    
+    player_ids, rows = [], []
+    for p, (pid, secret) in zip(players, key):
+        try:
+            emb = get_embedding(secret)
+        except Exception:
+            # Legacy fallback
+            emb = p.get("secret_embedding")
+        if emb is not None:
+            player_ids.append(pid)
+            rows.append(emb)
+    
+    unit = None
+    if rows:
+        unit = np.asarray(rows, dtype=np.float64)
+        norms = np.linalg.norm(unit, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        unit /= norms
+    
+    game['_secret_emb'] = (key, player_ids, unit)
+    return player_ids, unit
+
+
+def _cosine_matvec(mat: np.ndarray, vec) -> np.ndarray:
+    """Cosine similarity of every row of mat with vec."""
+    mat = np.asarray(mat, dtype=np.float32)
+    vec = np.asarray(vec, dtype=np.float32)
+    denom = np.linalg.norm(mat, axis=1) * np.linalg.norm(vec)
+    dots = (mat @ vec).astype(np.float64)
+    return np.divide(dots, denom, out=np.zeros_like(dots), where=denom > 0)
+
+
+def _indices_in_range(values: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """Indices i with lo < values[i] < hi, in order."""
+    return np.flatnonzero((values > lo) & (values < hi))
+
+
+def _unit_vector(embedding) -> np.ndarray:
+    """Embedding as an L2-normalized float32 vector (zero vector left as is)."""
+    vec = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _players_by_id(game: dict) -> dict:
+    """
+    Map player id -> player dict for O(1) lookups.
+    
+    Cached on game['_players_by_id'] (stripped by save_game) and rebuilt
+    whenever the players list is replaced or changes length (join/leave).
+    """
+    players = game.get("players", []) or []
+    cached = game.get('_players_by_id')
+    if cached is not None and cached[0] is players and cached[1] == len(players):
+        return cached[2]
+    by_id = {p.get("id"): p for p in players}
+    game['_players_by_id'] = (players, len(players), by_id)
+    return by_id
+
+
+def _turn_scratch(game: dict, key, factory):
+    """
+    Turn-scoped memo: compute factory() once per turn and stash it on the game.
+    
+    Lives under game['_turn_scratch'] and resets whenever the history grows or
+    the turn pointer moves (stripped by save_game).
+    """
+    stamp = (len(game.get('history') or []), game.get('current_turn'))
+    scratch = game.get('_turn_scratch')
+    if scratch is None or scratch.get('_stamp') != stamp:
+        scratch = {'_stamp': stamp}
+        game['_turn_scratch'] = scratch
+    if key not in scratch:
+        scratch[key] = factory()
+    return scratch[key]
+
+
+@dataclass
+class HistoryDigest:
+    """Per-opponent guess stats against one AI, built in a single history pass."""
+    guess_count: dict = field(default_factory=dict)         # pid -> guesses made
+    elimination_count: dict = field(default_factory=dict)   # pid -> eliminations scored
+    targeting_count: dict = field(default_factory=dict)     # pid -> guesses with sim > 0.5 vs AI
+    max_sim_against_ai: dict = field(default_factory=dict)  # pid -> best sim vs AI
+    dangerous_words: list = field(default_factory=list)     # (word, sim) with sim > 0.5 vs AI
+
+
+def _build_history_digest(game: dict, ai_id: str) -> HistoryDigest:
+    """
+    Scan game history once and summarize it from ai_id's point of view.
+    
+    Cached on game['_history_digest'] per AI and rebuilt when the history
+    length changes (stripped by save_game).
+    """
+    history = game.get("history", []) or []
+    cache = game.setdefault('_history_digest', {})
+    cached = cache.get(ai_id)
+    if cached is not None and cached[0] == len(history):
+        return cached[1]
+    
+    digest = HistoryDigest()
+    guess_count = digest.guess_count
+    elimination_count = digest.elimination_count
+    targeting_count = digest.targeting_count
+    max_sim = digest.max_sim_against_ai
+    
+    for entry in history:
+        if entry.get("type") == "word_change":
+            continue
+        
+        guesser_id = entry.get("guesser_id")
+        sims = entry.get("similarities", {})
+        sim_against_ai = sims.get(ai_id, 0)
+        
+        guess_count[guesser_id] = guess_count.get(guesser_id, 0) + 1
+        elimination_count[guesser_id] = (
+            elimination_count.get(guesser_id, 0) + len(entry.get("eliminations", []))
+        )
+        if sim_against_ai > 0.5:
+            targeting_count[guesser_id] = targeting_count.get(guesser_id, 0) + 1
+            word = entry.get("word")
+            if word:
+                digest.dangerous_words.append((word, sim_against_ai))
+        if sim_against_ai > max_sim.get(guesser_id, 0.0):
+            max_sim[guesser_id] = sim_against_ai
+    
+    cache[ai_id] = (len(history), digest)
+    return digest
+
+
+def _pairwise_sim_stats(unit: np.ndarray):
+    """
+    Mean and max cosine of each row of unit against every other row.
+    
+    Rows must be unit length and there must be at least two of them.
+    """
+    n = unit.shape[0]
+    sims = unit @ unit.T
+    others = sims[~np.eye(n, dtype=bool)].reshape(n, n - 1)
+    return others.mean(axis=1), others.max(axis=1)
+
+
 def _ai_select_isolated_word(word_pool: list) -> str:
     """
     Nemesis word selection: pick the most semantically isolated word.
@@ -1066,8 +1491,6 @@ def _ai_select_isolated_word(word_pool: list) -> str:
     
     Uses pre-computed theme similarity matrix when available for O(1) lookups.
     """
-    import random
-    
     if not word_pool or len(word_pool) == 1:
         return word_pool[0] if word_pool else None
     
@@ -1096,8 +1519,7 @@ def _ai_select_isolated_word(word_pool: list) -> str:
                     isolation_scores.append((word, isolation_score))
             
             if isolation_scores:
-                isolation_scores.sort(key=lambda x: x[1])
-                top_isolated = isolation_scores[:min(3, len(isolation_scores))]
+                top_isolated = heapq.nsmallest(3, isolation_scores, key=itemgetter(1))
                 return random.choice(top_isolated)[0]
         
         # Fallback: use cached embeddings from Redis
@@ -1111,36 +1533,19 @@ def _ai_select_isolated_word(word_pool: list) -> str:
         if len(embeddings) < 2:
             return random.choice(word_pool)
         
-        # Calculate isolation score for each word
-        isolation_scores = []
+        # Calculate isolation score for each word (cached embeddings are unit
+        # length, so one Gram matrix gives every pairwise cosine)
         words_list = list(embeddings.keys())
-        
-        for word in words_list:
-            word_emb = embeddings[word]
-            similarities = []
-            
-            for other_word in words_list:
-                if other_word == word:
-                    continue
-                other_emb = embeddings[other_word]
-                sim = cosine_similarity(word_emb, other_emb)
-                similarities.append(sim)
-            
-            if similarities:
-                avg_sim = sum(similarities) / len(similarities)
-                max_sim = max(similarities)
-                # Lower score = more isolated = better for defense
-                isolation_score = avg_sim + 0.5 * max_sim
-                isolation_scores.append((word, isolation_score))
+        avg_sim, max_sim = _pairwise_sim_stats(np.asarray([embeddings[w] for w in words_list], dtype=np.float64))
+        # Lower score = more isolated = better for defense
+        isolation_scores = list(zip(words_list, (avg_sim + 0.5 * max_sim).tolist()))
         
         if not isolation_scores:
             return random.choice(word_pool)
         
-        # Sort by isolation score (lower = more isolated)
-        isolation_scores.sort(key=lambda x: x[1])
-        
-        # Pick from the top 3 most isolated words (slight randomness to avoid predictability)
-        top_isolated = isolation_scores[:min(3, len(isolation_scores))]
+        # Pick from the top 3 most isolated words, lower score = more isolated
+        # (slight randomness to avoid predictability)
+        top_isolated = heapq.nsmallest(3, isolation_scores, key=itemgetter(1))
         return random.choice(top_isolated)[0]
         
     except Exception as e:
@@ -1158,8 +1563,6 @@ def _ai_select_counter_intel_word(ai_player: dict, game: dict, word_pool: list)
     
     Uses pre-computed theme similarity matrix when available for O(1) lookups.
     """
-    import random
-    
     if not word_pool:
         return None
     
@@ -1168,44 +1571,35 @@ def _ai_select_counter_intel_word(ai_player: dict, game: dict, word_pool: list)
     
     try:
         # Get the high-similarity guesses that opponents have made against us
-        ai_id = ai_player.get("id")
-        dangerous_words = []
-        
-        for entry in game.get("history", []):
-            if entry.get("type") == "word_change":
-                continue
-            sims = entry.get("similarities", {})
-            if ai_id in sims and sims[ai_id] > 0.5:
-                word = entry.get("word")
-                if word:
-                    dangerous_words.append((word, sims[ai_id]))
+        dangerous_words = _build_history_digest(game, ai_player.get("id")).dangerous_words
         
         # Fast path: use pre-computed similarity matrix if available
         similarity_matrix = game.get('theme_similarity_matrix') if game else None
         if similarity_matrix:
+            pool_lower = [w.lower() for w in word_pool]
+            dangerous_lower = [(dword.lower(), dsim) for dword, dsim in dangerous_words]
             word_scores = []
-            for word in word_pool:
-                word_lower = word.lower()
+            for word, word_lower in zip(word_pool, pool_lower):
                 word_sims = similarity_matrix.get(word_lower, {})
                 if not word_sims:
                     continue
                 
                 # Distance from dangerous words
                 danger_distance = 0
-                if dangerous_words:
-                    for dword, dsim in dangerous_words:
-                        sim_to_danger = word_sims.get(dword.lower(), 0.5)
+                if dangerous_lower:
+                    for dword_lower, dsim in dangerous_lower:
+                        sim_to_danger = word_sims.get(dword_lower, 0.5)
                         danger_distance += (1 - sim_to_danger) * dsim
-                    danger_distance /= len(dangerous_words)
+                    danger_distance /= len(dangerous_lower)
                 else:
                     danger_distance = 0.5
                 
                 # Isolation score
                 isolation_sims = []
-                for other_word in word_pool:
-                    if other_word.lower() == word_lower:
+                for other_lower in pool_lower:
+                    if other_lower == word_lower:
                         continue
-                    isolation_sims.append(word_sims.get(other_word.lower(), 0.5))
+                    isolation_sims.append(word_sims.get(other_lower, 0.5))
                 
                 if isolation_sims:
                     avg_sim = sum(isolation_sims) / len(isolation_sims)
@@ -1219,8 +1613,7 @@ def _ai_select_counter_intel_word(ai_player: dict, game: dict, word_pool: list)
                 word_scores.append((word, combined_score))
             
             if word_scores:
-                word_scores.sort(key=lambda x: x[1], reverse=True)
-                top_words = word_scores[:min(3, len(word_scores))]
+                top_words = heapq.nlargest(3, word_scores, key=itemgetter(1))
                 return random.choice(top_words)[0]
         
         # Fallback: use cached embeddings from Redis
@@ -1242,45 +1635,36 @@ def _ai_select_counter_intel_word(ai_player: dict, game: dict, word_pool: list)
             except Exception:
                 continue
         
-        # Score each word in pool
-        word_scores = []
-        for word, word_emb in pool_embeddings.items():
-            # Distance from dangerous words (weighted by how dangerous they were)
-            danger_distance = 0
-            if danger_embeddings:
-                for danger_emb, danger_sim in danger_embeddings:
-                    sim_to_danger = cosine_similarity(word_emb, danger_emb)
-                    # Higher distance from danger = better
-                    # Weight by how close the dangerous guess was
-                    danger_distance += (1 - sim_to_danger) * danger_sim
-                danger_distance /= len(danger_embeddings)
-            else:
-                danger_distance = 0.5  # Neutral if no dangerous guesses
-            
-            # Isolation score (same as _ai_select_isolated_word)
-            isolation_sims = []
-            for other_word, other_emb in pool_embeddings.items():
-                if other_word == word:
-                    continue
-                isolation_sims.append(cosine_similarity(word_emb, other_emb))
-            
-            if isolation_sims:
-                avg_sim = sum(isolation_sims) / len(isolation_sims)
-                max_sim = max(isolation_sims)
-                isolation_score = 1 - (avg_sim + 0.5 * max_sim)  # Higher = more isolated
-            else:
-                isolation_score = 0.5
-            
-            # Combined score: prioritize distance from danger, then isolation
-            total_score = danger_distance * 0.6 + isolation_score * 0.4
-            word_scores.append((word, total_score))
+        # Score each word in pool (cached embeddings are unit length, so
+        # cosines are plain matrix products)
+        pool_words = list(pool_embeddings)
+        pool_unit = np.asarray([pool_embeddings[w] for w in pool_words], dtype=np.float64)
+        
+        # Distance from dangerous words (weighted by how dangerous they were)
+        if danger_embeddings:
+            danger_unit = np.asarray([emb for emb, _ in danger_embeddings], dtype=np.float64)
+            danger_sims = np.asarray([dsim for _, dsim in danger_embeddings], dtype=np.float64)
+            # Higher distance from danger = better; weight by how close the dangerous guess was
+            danger_distance = ((1 - pool_unit @ danger_unit.T) * danger_sims).mean(axis=1)
+        else:
+            danger_distance = np.full(len(pool_words), 0.5)  # Neutral if no dangerous guesses
+        
+        # Isolation score (same as _ai_select_isolated_word)
+        if len(pool_words) > 1:
+            avg_sim, max_sim = _pairwise_sim_stats(pool_unit)
+            isolation_score = 1 - (avg_sim + 0.5 * max_sim)  # Higher = more isolated
+        else:
+            isolation_score = np.full(len(pool_words), 0.5)
+        
+        # Combined score: prioritize distance from danger, then isolation
+        total_score = danger_distance * 0.6 + isolation_score * 0.4
+        word_scores = list(zip(pool_words, total_score.tolist()))
         
         if not word_scores:
             return random.choice(word_pool)
         
         # Pick the best word (highest score)
-        word_scores.sort(key=lambda x: x[1], reverse=True)
-        return word_scores[0][0]
+        return max(word_scores, key=itemgetter(1))[0]
         
     except Exception as e:
         print(f"Error in _ai_select_counter_intel_word: {e}")
@@ -1299,21 +1683,19 @@ def _nemesis_init_beliefs(ai_player: dict, game: dict):
         memory["nemesis_beliefs"] = {}
     
     beliefs = memory["nemesis_beliefs"]
-    theme_words = game.get("theme", {}).get("words", [])
+    theme_words_lower = _theme_words_lower(game)
     
-    for player in game.get("players", []):
-        pid = player.get("id")
-        if pid == ai_player.get("id"):
-            continue
-        if not player.get("is_alive", True):
+    ai_id = ai_player.get("id")
+    for pid in _alive_player_ids(game)[0]:
+        if pid == ai_id:
             continue
         if pid not in beliefs:
             # Initialize uniform distribution over theme words
             # In practice, we don't know their pool, so use theme words
-            word_count = len(theme_words)
+            word_count = len(theme_words_lower)
             if word_count > 0:
                 uniform_prob = 1.0 / word_count
-                beliefs[pid] = {w.lower(): uniform_prob for w in theme_words}
+                beliefs[pid] = dict.fromkeys(theme_words_lower, uniform_prob)
             else:
                 beliefs[pid] = {}
     
@@ -1328,10 +1710,9 @@ def _nemesis_update_beliefs(ai_player: dict, game: dict, guess_word: str, simila
     For each opponent, update P(word | observations) using the similarity
     between the guess and each possible word.
     
-    Uses pre-computed similarity matrix for O(1) lookups when available.
+    Uses the dense similarity matrix so each opponent's update is a handful
+    of vector ops instead of a Python loop over the theme.
     """
-    import math
-    
     memory = ai_player.get("ai_memory", {})
     beliefs = memory.get("nemesis_beliefs", {})
     
@@ -1342,7 +1723,16 @@ def _nemesis_update_beliefs(ai_player: dict, game: dict, guess_word: str, simila
     guess_lower = guess_word.lower()
     
     # Fast path: use pre-computed similarity matrix
-    matrix = game.get('theme_similarity_matrix') if game else None
+    word_to_idx, sims = _theme_sim_index(game)
+    guess_idx = word_to_idx.get(guess_lower) if sims is not None else None
+    
+    # Likelihood: Gaussian on (observed - expected) similarity with sigma=0.15
+    sigma = 0.15
+    inv_two_sigma_sq = 1.0 / (2 * sigma ** 2)
+    
+    config = AI_DIFFICULTY_CONFIG.get("nemesis", {})
+    prune_eps = float(config.get("belief_prune_eps", 1e-6))
+    min_words = int(config.get("belief_min_words", 10))
     
     for player_id, observed_sim in similarities.items():
         if player_id == ai_player.get("id"):
@@ -1357,45 +1747,77 @@ def _nemesis_update_beliefs(ai_player: dict, game: dict, guess_word: str, simila
         # Bayesian update: P(word | obs) ∝ P(obs | word) * P(word)
         # P(obs | word) = likelihood that we'd see this similarity if word is their secret
         # We model this as a Gaussian centered on the expected similarity
+        words = list(player_beliefs)
+        n = len(words)
+        prior = np.fromiter(player_beliefs.values(), dtype=np.float64, count=n)
         
-        new_beliefs = {}
-        total_prob = 0.0
+        # Expected similarity per word; NaN where the matrix has no entry
+        expected = np.full(n, np.nan)
+        if guess_idx is not None:
+            idxs = np.fromiter((word_to_idx.get(w.lower(), -1) for w in words), dtype=np.intp, count=n)
+            known = idxs >= 0
+            expected[known] = sims[guess_idx, idxs[known]]
         
-        for word, prior_prob in player_beliefs.items():
-            word_lower = word.lower()
-            
-            # Get expected similarity from matrix or compute as fallback
-            expected_sim = None
-            if matrix and guess_lower in matrix:
-                expected_sim = matrix[guess_lower].get(word_lower)
-            
-            if expected_sim is None:
-                # Fallback: skip this word (rare - only if matrix incomplete)
-                new_beliefs[word] = prior_prob
-                total_prob += prior_prob
-                continue
-            
-            # Likelihood: how well does observed similarity match expected?
-            # Use Gaussian likelihood with sigma=0.15
-            sigma = 0.15
-            diff = observed_sim - expected_sim
-            likelihood = math.exp(-(diff ** 2) / (2 * sigma ** 2))
-            
-            posterior = prior_prob * likelihood
-            new_beliefs[word] = posterior
-            total_prob += posterior
+        likelihood = np.exp(-((observed_sim - expected) ** 2) * inv_two_sigma_sq)
+        # Fallback: keep the prior for words missing from the matrix (rare)
+        likelihood[np.isnan(expected)] = 1.0
+        
+        posterior = prior * likelihood
         
         # Normalize
+        total_prob = posterior.sum()
         if total_prob > 0:
-            for word in new_beliefs:
-                new_beliefs[word] /= total_prob
+            posterior /= total_prob
         
-        beliefs[player_id] = new_beliefs
+        # Beliefs get very peaked after a few guesses: prune negligible words so
+        # later updates (and the persisted game) only carry the live candidates,
+        # but keep the top min_words so a confident read is never thrown away.
+        if n > min_words:
+            keep = posterior >= prune_eps
+            if keep.sum() < min_words:
+                keep[np.argpartition(-posterior, min_words - 1)[:min_words]] = True
+            if not keep.all():
+                words = list(compress(words, keep))
+                posterior = posterior[keep]
+                kept_total = posterior.sum()
+                if kept_total > 0:
+                    posterior /= kept_total
+        
+        beliefs[player_id] = dict(zip(words, posterior.tolist()))
     
     memory["nemesis_beliefs"] = beliefs
     ai_player["ai_memory"] = memory
 
 
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k largest values, highest first.
+    
+    O(V) selection with np.partition instead of a full sort. Ties keep index
+    order, so the result matches a stable sort by value descending.
+    """
+    n = len(values)
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.intp)
+    if n <= k:
+        return np.argsort(-values, kind='stable')
+    
+    kth = np.partition(values, n - k)[n - k]
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    idx = np.concatenate((above, ties))
+    return idx[np.lexsort((idx, -values[idx]))]
+
+
+def _top_k_items(probabilities: dict, k: int) -> list:
+    """Top k (word, prob) pairs by probability, highest first (see _top_k_indices)."""
+    if k <= 0 or not probabilities:
+        return []
+    words = list(probabilities)
+    p = np.fromiter(probabilities.values(), dtype=np.float64, count=len(words))
+    return [(words[i], float(p[i])) for i in _top_k_indices(p, k)]
+
+
 def _nemesis_get_top_candidates(ai_player: dict, player_id: str, k: int = 5) -> list:
     """
     Get the top k most likely words for a player based on current beliefs.
@@ -1409,14 +1831,11 @@ def _nemesis_get_top_candidates(ai_player: dict, player_id: str, k: int = 5) ->
     if not player_beliefs:
         return []
     
-    sorted_beliefs = sorted(player_beliefs.items(), key=lambda x: x[1], reverse=True)
-    return sorted_beliefs[:k]
+    return _top_k_items(player_beliefs, k)
 
 
 def _nemesis_calculate_entropy(probabilities: dict) -> float:
     """Calculate Shannon entropy of a probability distribution."""
-    import math
-    
     entropy = 0.0
     for prob in probabilities.values():
         if prob > 0:
@@ -1424,146 +1843,79 @@ def _nemesis_calculate_entropy(probabilities: dict) -> float:
     return entropy
 
 
-def _nemesis_expected_info_gain(ai_player: dict, game: dict, guess_word: str, 
-                                 available_words: list) -> float:
-    """
-    Calculate expected information gain from making a guess.
-    
-    FAST VERSION: Uses a heuristic based on how well the guess word
-    discriminates between high-probability and low-probability candidates
-    in our beliefs. Uses pre-computed similarity matrix for speed.
-    """
-    memory = ai_player.get("ai_memory", {})
-    beliefs = memory.get("nemesis_beliefs", {})
-    
-    if not beliefs:
-        return 0.0
-    
-    guess_lower = guess_word.lower()
-    
-    # Fast path: use pre-computed similarity matrix
-    matrix = game.get('theme_similarity_matrix') if game else None
-    
-    total_info_gain = 0.0
-    
-    for player in game.get("players", []):
-        pid = player.get("id")
-        if pid == ai_player.get("id"):
-            continue
-        if not player.get("is_alive", True):
-            continue
-        if pid not in beliefs:
-            continue
-        
-        player_beliefs = beliefs[pid]
-        if not player_beliefs:
-            continue
-        
-        # Fast heuristic: measure variance in similarities to top candidates
-        # High variance = good discriminating power = high info gain
-        top_candidates = sorted(player_beliefs.items(), key=lambda x: x[1], reverse=True)[:5]
-        if not top_candidates:
-            continue
-        
-        similarities = []
-        for word, prob in top_candidates:
-            word_lower = word.lower()
-            
-            # Get similarity from matrix
-            if matrix and guess_lower in matrix:
-                sim = matrix[guess_lower].get(word_lower)
-                if sim is not None:
-                    similarities.append(sim)
-        
-        if len(similarities) >= 2:
-            # Variance of similarities indicates discrimination power
-            mean_sim = sum(similarities) / len(similarities)
-            variance = sum((s - mean_sim) ** 2 for s in similarities) / len(similarities)
-            total_info_gain += variance * 10  # Scale up for scoring
-    
-    return total_info_gain
-
-
-def _nemesis_calculate_elimination_prob(ai_player: dict, game: dict, 
-                                         guess_word: str) -> dict:
+def _nemesis_leak_penalty(self_sims, soft_max: float, hard_max: float):
     """
-    Calculate probability that a guess will eliminate each opponent.
+    Self-leak penalty for one similarity or a vector of them.
     
-    Returns dict of player_id -> probability of elimination.
+    Branchless: flat 10.0 above hard_max, linear ramp above soft_max, else 0.
     """
-    memory = ai_player.get("ai_memory", {})
-    beliefs = memory.get("nemesis_beliefs", {})
-    
-    elimination_probs = {}
-    guess_lower = guess_word.lower()
-    
-    for player in game.get("players", []):
-        pid = player.get("id")
-        if pid == ai_player.get("id"):
-            continue
-        if not player.get("is_alive", True):
-            continue
-        
-        player_beliefs = beliefs.get(pid, {})
-        
-        # Probability of elimination = probability that guess IS their word
-        elim_prob = player_beliefs.get(guess_lower, 0.0)
-        elimination_probs[pid] = elim_prob
-    
-    return elimination_probs
+    s = np.asarray(self_sims, dtype=np.float64)
+    return np.where(s > hard_max, 10.0, np.where(s > soft_max, (s - soft_max) * 5.0, 0.0))
 
 
-def _nemesis_score_guess(ai_player: dict, game: dict, guess_word: str,
-                         available_words: list) -> float:
+def _nemesis_score_candidates(ai_player: dict, game: dict, candidates: list,
+                              leak_penalties) -> np.ndarray:
     """
-    Calculate total score for a guess using Nemesis strategy.
-    
-    Score combines:
-    - Expected information gain (learning about opponents)
-    - Elimination probability (chance of direct kill)
-    - Self-leak penalty (risk of revealing our word)
-    - Threat assessment (priority for dangerous opponents)
+    Score a batch of candidate guesses using the Nemesis strategy.
+    
+    For each candidate, summed over alive opponents:
+    - information gain: 10x the variance of its similarities to the
+      opponent's top-5 belief words (needs at least two in the matrix),
+      weighted 0.3
+    - elimination probability (our belief it is their word), weighted 2.0
+    - the same probability weighted by 1 + the opponent's threat level
+    minus the candidate's self-leak penalty (from _nemesis_leak_penalty).
+    
+    Gathers the similarity blocks and elimination probs into arrays, then
+    scores every candidate in one vectorized NumPy pass.
     """
-    config = AI_DIFFICULTY_CONFIG.get("nemesis", {})
-    
-    # Information gain component
-    info_gain = _nemesis_expected_info_gain(ai_player, game, guess_word, available_words)
-    
-    # Elimination probability
-    elim_probs = _nemesis_calculate_elimination_prob(ai_player, game, guess_word)
-    total_elim_prob = sum(elim_probs.values())
-    
-    # Threat-weighted elimination (prioritize eliminating players targeting us)
-    threat_weighted_elim = 0.0
-    for pid, elim_prob in elim_probs.items():
-        threat_level = _nemesis_get_threat_level(ai_player, game, pid)
-        threat_weighted_elim += elim_prob * (1 + threat_level)
-    
-    # Self-leak penalty (use cached embeddings)
-    self_sim = _ai_self_similarity(ai_player, guess_word, game)
-    if self_sim is None:
-        self_sim = 0.0
-    
-    soft_max = float(config.get("self_leak_soft_max", 0.65))
-    hard_max = float(config.get("self_leak_hard_max", 0.80))
-    
-    if self_sim > hard_max:
-        leak_penalty = 10.0  # Severe penalty
-    elif self_sim > soft_max:
-        leak_penalty = (self_sim - soft_max) * 5.0
-    else:
-        leak_penalty = 0.0
-    
-    # Combined score
-    # Weights tuned for aggressive but safe play
-    score = (
-        info_gain * 0.3 +           # Learning value
-        total_elim_prob * 2.0 +      # Direct elimination value
-        threat_weighted_elim * 1.0 - # Threat-weighted bonus
-        leak_penalty                 # Safety penalty
+    ai_id = ai_player.get("id")
+    beliefs = ai_player.get("ai_memory", {}).get("nemesis_beliefs", {})
+    word_to_idx, sims = _theme_sim_index(game)
+    
+    cand_lower = [w.lower() for w in candidates]
+    opponents = [pid for pid in _alive_player_ids(game)[0] if pid != ai_id]
+    C, P, K = len(candidates), len(opponents), 5
+    
+    top_sims = np.full((P, C, K), np.nan)
+    elim = np.zeros((C, P))
+    threat_weights = np.empty(P)
+    
+    if sims is not None:
+        cand_idx = np.fromiter((word_to_idx.get(w, -1) for w in cand_lower), dtype=np.intp, count=C)
+        cand_known = cand_idx >= 0
+    
+    for j, pid in enumerate(opponents):
+        player_beliefs = beliefs.get(pid) or {}
+        if player_beliefs:
+            elim[:, j] = [player_beliefs.get(w, 0.0) for w in cand_lower]
+            if sims is not None:
+                top_idx = np.fromiter(
+                    (word_to_idx.get(w.lower(), -1) for w, _ in _top_k_items(player_beliefs, K)),
+                    dtype=np.intp,
+                )
+                top_idx = top_idx[top_idx >= 0]
+                if top_idx.size:
+                    top_sims[j, cand_known, :top_idx.size] = sims[np.ix_(cand_idx[cand_known], top_idx)]
+        threat_weights[j] = 1 + _nemesis_get_threat_level(ai_player, game, pid)
+    
+    leak = np.asarray(leak_penalties, dtype=np.float64)
+    
+    # Variance of similarities to top candidates = discriminating power
+    valid = ~np.isnan(top_sims)
+    counts = valid.sum(axis=2)
+    denom = np.maximum(counts, 1)
+    filled = np.where(valid, top_sims, 0.0)
+    mean = filled.sum(axis=2) / denom
+    variance = (np.where(valid, top_sims - mean[..., None], 0.0) ** 2).sum(axis=2) / denom
+    info_gain = (np.where(counts >= 2, variance, 0.0) * 10).sum(axis=0)
+    
+    return (
+        info_gain * 0.3 +
+        elim.sum(axis=1) * 2.0 +
+        (elim @ threat_weights) * 1.0 -
+        leak
     )
-    
-    return score
 
 
 def _nemesis_get_threat_level(ai_player: dict, game: dict, opponent_id: str) -> float:
@@ -1576,37 +1928,19 @@ def _nemesis_get_threat_level(ai_player: dict, game: dict, opponent_id: str) ->
     - Their elimination count (skill indicator)
     - Their health (healthy = more dangerous)
     """
-    ai_id = ai_player.get("id")
-    history = game.get("history", [])
+    digest = _build_history_digest(game, ai_player.get("id"))
     
     # Count how often they've targeted us (high similarity guesses)
-    targeting_count = 0
-    max_sim_against_us = 0.0
-    their_eliminations = 0
-    total_their_guesses = 0
-    
-    for entry in history:
-        if entry.get("type") == "word_change":
-            continue
-        
-        guesser_id = entry.get("guesser_id")
-        sims = entry.get("similarities", {})
-        elims = entry.get("eliminations", [])
-        
-        if guesser_id == opponent_id:
-            total_their_guesses += 1
-            their_eliminations += len(elims)
-            
-            sim_against_us = sims.get(ai_id, 0)
-            if sim_against_us > 0.5:
-                targeting_count += 1
-            max_sim_against_us = max(max_sim_against_us, sim_against_us)
+    targeting_count = digest.targeting_count.get(opponent_id, 0)
+    max_sim_against_us = digest.max_sim_against_ai.get(opponent_id, 0.0)
+    their_eliminations = digest.elimination_count.get(opponent_id, 0)
+    total_their_guesses = digest.guess_count.get(opponent_id, 0)
     
     # Calculate targeting rate
     targeting_rate = targeting_count / max(1, total_their_guesses)
     
     # Get opponent's vulnerability (inverse of their health)
-    opponent = next((p for p in game.get("players", []) if p.get("id") == opponent_id), None)
+    opponent = _players_by_id(game).get(opponent_id)
     if opponent:
         opp_danger = _ai_danger_score(_ai_top_guesses_since_change(game, opponent_id, k=3))
         health = 1 - opp_danger  # Higher danger = lower health
@@ -1630,8 +1964,6 @@ def _nemesis_choose_guess(ai_player: dict, game: dict) -> str:
     
     Evaluates all candidate words and picks the one with highest score.
     """
-    import random
-    
     theme_words = game.get("theme", {}).get("words", [])
     my_secret = (ai_player.get("secret_word") or "").lower().strip()
     config = AI_DIFFICULTY_CONFIG.get("nemesis", {})
@@ -1639,24 +1971,26 @@ def _nemesis_choose_guess(ai_player: dict, game: dict) -> str:
     # Initialize beliefs if needed
     _nemesis_init_beliefs(ai_player, game)
     
-    # Get stale guessed words (guessed but no word_change since)
-    stale_guessed = _get_stale_guessed_words(game)
-    
-    # Build available words - prefer words that haven't been guessed or are reguessable
-    available_words = []
-    deprioritized_words = []
-    for w in theme_words:
-        wl = w.lower()
-        if wl == my_secret:
-            continue
-        if wl in stale_guessed:
-            deprioritized_words.append(w)
-        else:
-            available_words.append(w)
+    def build_available():
+        # Get stale guessed words (guessed but no word_change since)
+        stale_guessed = _history_word_index(game).stale
+        
+        # Build available words - prefer words that haven't been guessed or are reguessable
+        available_words = []
+        deprioritized_words = []
+        for w, wl in zip(theme_words, _theme_words_lower(game)):
+            if wl == my_secret:
+                continue
+            if wl in stale_guessed:
+                deprioritized_words.append(w)
+            else:
+                available_words.append(w)
+        
+        # If all words have been guessed (rare), fall back to deprioritized
+        return available_words or deprioritized_words
     
-    # If all words have been guessed (rare), fall back to deprioritized
-    if not available_words:
-        available_words = deprioritized_words
+    ai_id = ai_player.get("id")
+    available_words = _turn_scratch(game, ('nemesis_available', ai_id, my_secret), build_available)
     
     if not available_words:
         return None
@@ -1667,19 +2001,25 @@ def _nemesis_choose_guess(ai_player: dict, game: dict) -> str:
     # For efficiency, evaluate a sample of candidates
     if len(available_words) > pool_size:
         # Prioritize words that are likely to be opponents' secrets
-        candidates = _nemesis_get_priority_candidates(ai_player, game, available_words, pool_size)
+        candidates = _turn_scratch(
+            game, ('nemesis_priority', ai_id, my_secret, pool_size),
+            lambda: _nemesis_get_priority_candidates(ai_player, game, available_words, pool_size),
+        )
     else:
         candidates = available_words
     
-    # Score each candidate
-    best_word = None
-    best_score = float('-inf')
+    # Self-leak penalties for all candidates in one vectorized pass
+    leak_penalties = _nemesis_leak_penalty(
+        _ai_self_similarities(ai_player, game, candidates),
+        float(config.get("self_leak_soft_max", 0.65)),
+        float(config.get("self_leak_hard_max", 0.80)),
+    )
     
-    for word in candidates:
-        score = _nemesis_score_guess(ai_player, game, word, available_words)
-        if score > best_score:
-            best_score = score
-            best_word = word
+    # Score all candidates in one fused pass and take the best (first on ties)
+    if not candidates:
+        return random.choice(available_words)
+    scores = _nemesis_score_candidates(ai_player, game, candidates, leak_penalties)
+    best_word = candidates[int(np.argmax(scores))]
     
     return best_word if best_word else random.choice(available_words)
 
@@ -1694,59 +2034,79 @@ def _nemesis_get_priority_candidates(ai_player: dict, game: dict,
     2. Words similar to high-scoring guesses (using similarity matrix)
     3. Random sample for exploration
     """
-    import random
-    
     memory = ai_player.get("ai_memory", {})
     beliefs = memory.get("nemesis_beliefs", {})
-    matrix = game.get('theme_similarity_matrix') if game else None
     
     priority_words = set()
     
+    # Lowercase each available word once; map back to original casing (first wins)
+    available_lower = [w.lower() for w in available_words]
+    original_casing = {}
+    for aw, aw_lower in zip(available_words, available_lower):
+        original_casing.setdefault(aw_lower, aw)
+    
     # Add top candidates from beliefs
     for pid, player_beliefs in beliefs.items():
-        top_words = sorted(player_beliefs.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_words = _top_k_items(player_beliefs, 10)
         for word, prob in top_words:
-            if word in [w.lower() for w in available_words]:
-                # Find original casing
-                for aw in available_words:
-                    if aw.lower() == word:
-                        priority_words.add(aw)
-                        break
+            aw = original_casing.get(word)
+            if aw is not None:
+                priority_words.add(aw)
     
     # Add words similar to recent high-similarity guesses (using similarity matrix)
-    for player in game.get("players", []):
-        pid = player.get("id")
-        if pid == ai_player.get("id"):
-            continue
-        top_guesses = _ai_top_guesses_since_change(game, pid, k=3)
-        for word, sim in top_guesses:
-            if sim > 0.5:
-                word_lower = word.lower()
-                # Find similar words using similarity matrix
-                if matrix and word_lower in matrix:
-                    for aw in available_words[:50]:  # Sample for efficiency
-                        aw_lower = aw.lower()
-                        sim_to_word = matrix[word_lower].get(aw_lower)
-                        if sim_to_word is not None and sim_to_word > 0.6:
-                            priority_words.add(aw)
-    
-    # Fill remaining with random sample
-    remaining = count - len(priority_words)
+    word_to_idx, sims = _theme_sim_index(game)
+    if sims is not None:
+        top_guess_idxs = []
+        for player in game.get("players", []):
+            pid = player.get("id")
+            if pid == ai_player.get("id"):
+                continue
+            for word, sim in _ai_top_guesses_since_change(game, pid, k=3):
+                if sim > 0.5:
+                    idx = word_to_idx.get(word.lower())
+                    if idx is not None:
+                        top_guess_idxs.append(idx)
+        
+        if top_guess_idxs:
+            avail_words = []
+            avail_idxs = []
+            for aw, aw_lower in zip(available_words[:50], available_lower):  # Sample for efficiency
+                idx = word_to_idx.get(aw_lower)
+                if idx is not None:
+                    avail_words.append(aw)
+                    avail_idxs.append(idx)
+            if avail_idxs:
+                # (A, G) block of similarities; NaN (missing pair) never passes the threshold
+                S = sims[np.ix_(avail_idxs, top_guess_idxs)]
+                mask = (S > 0.6).any(axis=1)
+                priority_words.update(compress(avail_words, mask))
+    
+    # Fill remaining with random sample (boolean mask over available_words)
+    priority_mask = np.fromiter(
+        (w in priority_words for w in available_words), dtype=bool, count=len(available_words)
+    )
+    remaining = count - int(priority_mask.sum())
     if remaining > 0:
-        other_words = [w for w in available_words if w not in priority_words]
-        if other_words:
-            priority_words.update(random.sample(other_words, min(remaining, len(other_words))))
+        other_idxs = np.flatnonzero(~priority_mask)
+        if other_idxs.size:
+            picks = np.random.choice(other_idxs, size=min(remaining, other_idxs.size), replace=False)
+            priority_mask[picks] = True
     
-    return list(priority_words)[:count]
+    return list(compress(available_words, priority_mask))[:count]
+
+
+@lru_cache(maxsize=256)
+def _freq_sorted_pool(word_pool: tuple) -> tuple:
+    """Word pool sorted by ascending English word frequency (memoized per pool)."""
+    freqs = [word_frequency(w.lower(), 'en') for w in word_pool]
+    order = sorted(range(len(word_pool)), key=freqs.__getitem__)
+    return tuple(word_pool[i] for i in order)
 
 
 def ai_select_secret_word(ai_player: dict, word_pool: list) -> str:
     """AI selects a secret word based on difficulty."""
-    import random
-    
     difficulty = ai_player.get("difficulty", "rookie")
-    default_cfg = AI_DIFFICULTY_CONFIG.get("rookie") or {}
-    config = AI_DIFFICULTY_CONFIG.get(difficulty, default_cfg)
+    config = AI_DIFFICULTY_CONFIG.get(difficulty, AI_DEFAULT_DIFFICULTY_CONFIG)
     selection_mode = config.get("word_selection", "random")
     
     if not word_pool:
@@ -1757,20 +2117,14 @@ def ai_select_secret_word(ai_player: dict, word_pool: list) -> str:
             return random.choice(word_pool)
         
         elif selection_mode == "avoid_common":
-            # Sort by word frequency (less common = better) and pick from bottom half
-            words_with_freq = [(w, word_frequency(w.lower(), 'en')) for w in word_pool]
-            words_with_freq.sort(key=lambda x: x[1])
-            # Pick from the less common half
-            less_common = words_with_freq[:len(words_with_freq)//2 + 1]
-            return random.choice(less_common)[0]
+            # Pick from the less common half (sorted by word frequency, less common = better)
+            by_freq = _freq_sorted_pool(tuple(word_pool))
+            return random.choice(by_freq[:len(by_freq)//2 + 1])
         
         elif selection_mode == "obscure":
             # Pick from the least common 10% of words (harder to guess)
-            words_with_freq = [(w, word_frequency(w.lower(), 'en')) for w in word_pool]
-            words_with_freq.sort(key=lambda x: x[1])
-            obscure_count = max(1, len(words_with_freq)//10)
-            obscure_words = words_with_freq[:obscure_count]
-            return random.choice(obscure_words)[0]
+            by_freq = _freq_sorted_pool(tuple(word_pool))
+            return random.choice(by_freq[:max(1, len(by_freq)//10)])
         
         elif selection_mode == "isolated":
             # Nemesis strategy: pick words that are semantically isolated
@@ -1784,6 +2138,26 @@ def ai_select_secret_word(ai_player: dict, word_pool: list) -> str:
         return random.choice(word_pool)
 
 
+# Number of best guesses remembered per target in high_similarity_targets
+AI_TARGET_MEMORY_SIZE = 5
+
+
+def _similarity_heap(entries: list) -> list:
+    """
+    high_similarity_targets entries as a (similarity, word) min-heap of tuples.
+    
+    JSON turns the tuples into lists, and games saved before the heap stored
+    [word, similarity] pairs sorted best-first; both are normalized here.
+    """
+    if not entries:
+        return []
+    if isinstance(entries[0][0], str):
+        heap = [(sim, word) for word, sim in entries]
+        heapq.heapify(heap)
+        return heap
+    return [tuple(e) for e in entries]
+
+
 def ai_update_memory(ai_player: dict, guess_word: str, similarities: dict, game: dict):
     """Update AI's memory after a guess is made."""
     memory = ai_player.get("ai_memory", {})
@@ -1795,18 +2169,20 @@ def ai_update_memory(ai_player: dict, guess_word: str, similarities: dict, game:
     memory["guessed_words"].append(guess_word.lower())
     
     # Track high similarities for targeting
+    players_by_id = _players_by_id(game)
     for player_id, sim in similarities.items():
         if player_id == ai_player["id"]:
             continue
         # Only track if player is still alive
-        player = next((p for p in game["players"] if p["id"] == player_id), None)
+        player = players_by_id.get(player_id)
         if player and player.get("is_alive", True):
-            if player_id not in memory["high_similarity_targets"]:
-                memory["high_similarity_targets"][player_id] = []
-            memory["high_similarity_targets"][player_id].append((guess_word, sim))
-            # Keep only top 5 similarities per player
-            memory["high_similarity_targets"][player_id].sort(key=lambda x: x[1], reverse=True)
-            memory["high_similarity_targets"][player_id] = memory["high_similarity_targets"][player_id][:5]
+            # Keep only top 5 similarities per player (bounded min-heap)
+            heap = _similarity_heap(memory["high_similarity_targets"].get(player_id))
+            if len(heap) < AI_TARGET_MEMORY_SIZE:
+                heapq.heappush(heap, (sim, guess_word))
+            else:
+                heapq.heappushpop(heap, (sim, guess_word))
+            memory["high_similarity_targets"][player_id] = heap
     
     ai_player["ai_memory"] = memory
     
@@ -1824,33 +2200,38 @@ def ai_find_best_target(ai_player: dict, game: dict) -> Optional[dict]:
     if not targets:
         return None
     
-    best_target = None
+    # In singleplayer, bots should target each other too (no "team vs human" behavior)
+    alive_ids = _alive_player_ids(game)[1]
+    
     best_score = 0
+    best_pid = None
+    best_top = None
     
     for player_id, sims in targets.items():
-        # Check if player is still alive
-        player = next((p for p in game["players"] if p["id"] == player_id), None)
-        # In singleplayer, bots should target each other too (no "team vs human" behavior)
-        if not player or not player.get("is_alive", True):
+        if player_id not in alive_ids or not sims:
             continue
         
-        if sims:
-            # Calculate a weighted score: highest similarity matters most
-            top_sim = sims[0][1] if sims else 0
-            avg_sim = sum(s[1] for s in sims) / len(sims) if sims else 0
-            score = top_sim * 0.7 + avg_sim * 0.3
-            
-            if score > best_score:
-                best_score = score
-                best_target = {
-                    "player_id": player_id,
-                    "player_name": player["name"],
-                    "top_word": sims[0][0] if sims else None,
-                    "top_similarity": top_sim,
-                    "score": score,
-                }
+        # Calculate a weighted score: highest similarity matters most
+        ranked = sorted(_similarity_heap(sims), reverse=True)
+        top_sim = ranked[0][0]
+        avg_sim = sum(s for s, _ in ranked) / len(ranked)
+        score = top_sim * 0.7 + avg_sim * 0.3
+        
+        if score > best_score:
+            best_score = score
+            best_pid = player_id
+            best_top = ranked[0]
+    
+    if best_pid is None:
+        return None
     
-    return best_target
+    return {
+        "player_id": best_pid,
+        "player_name": _players_by_id(game)[best_pid]["name"],
+        "top_word": best_top[1],
+        "top_similarity": best_top[0],
+        "score": best_score,
+    }
 
 
 def ai_find_similar_words(target_word: str, theme_words: list, guessed_words: list, count: int = 5, game: dict = None) -> list:
@@ -1863,109 +2244,173 @@ def ai_find_similar_words(target_word: str, theme_words: list, guessed_words: li
     """
     try:
         target_lower = target_word.lower()
+        if game and theme_words is (game.get('theme') or {}).get('words'):
+            words_lower = _theme_words_lower(game)
+        else:
+            words_lower = [w.lower() for w in theme_words]
         
-        # Fast path: use pre-computed similarity matrix
-        matrix = game.get('theme_similarity_matrix') if game else None
-        if matrix and target_lower in matrix:
-            candidates = []
-            for word in theme_words:
-                word_lower = word.lower()
-                sim = matrix[target_lower].get(word_lower, 0)
-                candidates.append((word, sim))
-            candidates.sort(key=lambda x: x[1], reverse=True)
-            return [c[0] for c in candidates[:count]]
+        # Fast path: one row of the pre-computed similarity matrix
+        row = _theme_sim_row(game, target_lower, words_lower) if game else None
+        if row is not None:
+            row = np.nan_to_num(row, nan=0.0)
+            return [theme_words[i] for i in _top_k_indices(row, count)]
         
         # Fallback: use cached embeddings (shouldn't happen often if matrix is pre-computed)
-        theme_embeddings = get_theme_embeddings(game) if game else {}
+        emb_index, unit = _theme_embedding_index(game) if game else (None, None)
+        emb_index = emb_index or {}
         
-        target_embedding = theme_embeddings.get(target_lower)
-        if not target_embedding:
-            target_embedding = get_embedding(target_word, game)
+        if target_lower in emb_index:
+            target_vec = unit[emb_index[target_lower]]
+        else:
+            target_vec = _unit_vector(get_embedding(target_word, game))
         
-        candidates = []
-        for word in theme_words:
-            word_lower = word.lower()
-            word_embedding = theme_embeddings.get(word_lower)
-            if not word_embedding:
-                word_embedding = get_embedding(word, game)
-            sim = cosine_similarity(target_embedding, word_embedding)
-            candidates.append((word, sim))
+        # One matvec for every theme word with a cached embedding
+        idxs = np.fromiter((emb_index.get(w, -1) for w in words_lower), dtype=np.intp, count=len(theme_words))
+        known = idxs >= 0
+        sims = np.empty(len(theme_words))
+        if known.any():
+            sims[known] = _cosine_matvec(unit[idxs[known]], target_vec)
+        for i in np.flatnonzero(~known):
+            sims[i] = cosine_similarity(target_vec, get_embedding(theme_words[i], game))
         
-        # Sort by similarity and return top candidates
-        candidates.sort(key=lambda x: x[1], reverse=True)
-        return [c[0] for c in candidates[:count]]
+        # Top candidates by similarity
+        return [theme_words[i] for i in _top_k_indices(sims, count)]
     
     except Exception as e:
         print(f"Error finding similar words: {e}")
         return []
 
 
+def _last_word_change_by_player(game: dict) -> dict:
+    """
+    Map player_id -> history index just after their last word change.
+    
+    Kept on game['_last_word_change_by_player'] (stripped by save_game) and
+    extended from only the entries appended since the previous call, so each
+    history entry is inspected once per request.
+    """
+    history = game.get("history", []) or []
+    cached = game.get('_last_word_change_by_player')
+    if cached is None or cached[0] is not history or cached[1] > len(history):
+        cached = [history, 0, {}]
+        game['_last_word_change_by_player'] = cached
+    
+    by_player = cached[2]
+    for idx in range(cached[1], len(history)):
+        entry = history[idx]
+        if entry.get("type") == "word_change":
+            by_player[entry.get("player_id")] = idx + 1
+    cached[1] = len(history)
+    return by_player
+
+
+AI_RECENT_CLUE_WINDOW = 20  # History entries scanned for strategic clues
+
+
+def on_guess_recorded(game: dict, entry: dict) -> None:
+    """
+    Feed one newly appended history entry into the recent-clue window.
+    
+    The window (game['_recent_best_clue'], stripped by save_game) holds the last
+    AI_RECENT_CLUE_WINDOW entries as (idx, word, similarities); the per-player
+    best is recomputed lazily on the next read.
+    """
+    state = game.get('_recent_best_clue')
+    if state is None:
+        return
+    idx = state[1]
+    history = state[0]
+    if idx >= len(history) or history[idx] is not entry:
+        return  # Out of sequence; the next read catches up from history
+    state[2].append((idx, (entry.get("word") or "").lower(), entry.get("similarities") or {}))
+    state[1] = idx + 1
+    state[3] = None
+
+
+def _recent_best_clues(game: dict) -> dict:
+    """
+    Map player_id -> (sim, idx, -pos, word): the strongest recent guess against them.
+    
+    Ordering of the tuples mirrors a newest-first scan of the last
+    AI_RECENT_CLUE_WINDOW history entries (ties go to the newer entry, then to
+    the earlier player in that entry), so max() over any subset of players
+    picks the same clue a full scan would.
+    """
+    history = game.get("history", []) or []
+    state = game.get('_recent_best_clue')
+    if state is None or state[0] is not history or state[1] > len(history):
+        start = max(0, len(history) - AI_RECENT_CLUE_WINDOW)
+        state = [history, start, deque(maxlen=AI_RECENT_CLUE_WINDOW), None]
+        game['_recent_best_clue'] = state
+    for idx in range(state[1], len(history)):
+        on_guess_recorded(game, history[idx])
+    
+    if state[3] is None:
+        best = {}
+        for idx, word, sims in state[2]:
+            for pos, (pid, sim) in enumerate(sims.items()):
+                if sim > 0.0:
+                    cand = (sim, idx, -pos, word)
+                    cur = best.get(pid)
+                    if cur is None or cand > cur:
+                        best[pid] = cand
+        state[3] = best
+    return state[3]
+
+
 def _ai_last_word_change_index(game: dict, player_id: str) -> int:
     """
     Return the history index after the player's last word change. If never changed, return 0.
     This mirrors the frontend's "ignore clues before word change" behavior.
     """
     try:
-        idx_after = 0
-        history = game.get("history", []) or []
-        for idx, entry in enumerate(history):
-            if entry.get("type") == "word_change" and entry.get("player_id") == player_id:
-                idx_after = idx + 1
-        return idx_after
+        return _last_word_change_by_player(game).get(player_id, 0)
     except Exception:
         return 0
 
 
-def _get_reguessable_words(game: dict) -> set:
-    """
-    Return set of previously-guessed words that are worth re-guessing.
-    A word is reguessable if any player changed their word since that word was last guessed.
-    """
-    history = game.get('history', []) or []
-    
-    # Find last guess index for each word
-    last_guessed_at = {}
-    for idx, entry in enumerate(history):
-        if entry.get('type') != 'word_change':
-            word = (entry.get('word') or '').lower()
-            if word:
-                last_guessed_at[word] = idx
-    
-    # Find word change indices
-    word_change_indices = [
-        idx for idx, entry in enumerate(history)
-        if entry.get('type') == 'word_change'
-    ]
-    
-    # A word is reguessable if any word_change happened after it was guessed
-    reguessable = set()
-    for word, guess_idx in last_guessed_at.items():
-        if any(wc_idx > guess_idx for wc_idx in word_change_indices):
-            reguessable.add(word)
-    
-    return reguessable
+@dataclass
+class HistoryWordIndex:
+    """Guessed-word bookkeeping derived from game history (see _history_word_index)."""
+    all_guessed: set = field(default_factory=set)        # every guessed word (lowercase)
+    reguessable: set = field(default_factory=set)        # guessed, then someone changed word
+    stale: set = field(default_factory=set)              # guessed, no word_change since
+    last_guessed_at: dict = field(default_factory=dict)  # word -> history index of last guess
 
 
-def _get_stale_guessed_words(game: dict) -> set:
+def _history_word_index(game: dict) -> HistoryWordIndex:
     """
-    Return set of previously-guessed words that should be deprioritized.
-    These are words that were guessed but no word_change has happened since.
+    Guessed / reguessable / stale word sets, maintained incrementally over history.
+    
+    Cached on game['_history_word_cache'] (stripped by save_game) and extended
+    from only the entries appended since the previous call, so each history
+    entry is inspected once per request. The sets are updated in place as
+    history grows; callers must treat them as read-only and not hold them
+    across history appends.
     """
     history = game.get('history', []) or []
-    
-    # Find all guessed words
-    all_guessed = set()
-    for entry in history:
-        if entry.get('type') != 'word_change':
-            word = (entry.get('word') or '').lower()
-            if word:
-                all_guessed.add(word)
-    
-    # Get reguessable words
-    reguessable = _get_reguessable_words(game)
-    
-    # Stale = guessed but not reguessable
-    return all_guessed - reguessable
+    cached = game.get('_history_word_cache')
+    if cached is None or cached[0] is not history or cached[1] > len(history):
+        cached = [history, 0, HistoryWordIndex()]
+        game['_history_word_cache'] = cached
+    
+    index = cached[2]
+    for idx in range(cached[1], len(history)):
+        entry = history[idx]
+        if entry.get('type') == 'word_change':
+            # Every word guessed so far was guessed before this change
+            index.reguessable.update(index.all_guessed)
+            index.stale.clear()
+            continue
+        word = (entry.get('word') or '').lower()
+        if word:
+            # A fresh guess makes the word stale until the next word_change
+            index.last_guessed_at[word] = idx
+            index.all_guessed.add(word)
+            index.reguessable.discard(word)
+            index.stale.add(word)
+    cached[1] = len(history)
+    return index
 
 
 def _ai_top_guesses_since_change(game: dict, target_player_id: str, k: int = 3) -> list:
@@ -1973,9 +2418,7 @@ def _ai_top_guesses_since_change(game: dict, target_player_id: str, k: int = 3)
     history = game.get("history", []) or []
     start = _ai_last_word_change_index(game, target_player_id)
     scored = []
-    for idx, entry in enumerate(history):
-        if idx < start:
-            continue
+    for entry in history[start:]:
         if entry.get("type") == "word_change":
             continue
         sims = entry.get("similarities") or {}
@@ -1989,8 +2432,7 @@ def _ai_top_guesses_since_change(game: dict, target_player_id: str, k: int = 3)
         except Exception:
             continue
         scored.append((str(w), sim))
-    scored.sort(key=lambda x: x[1], reverse=True)
-    return scored[: max(0, int(k or 0))]
+    return heapq.nlargest(max(0, int(k or 0)), scored, key=itemgetter(1))
 
 
 def _ai_danger_score(top_guesses: list) -> float:
@@ -2010,96 +2452,157 @@ def _ai_danger_score(top_guesses: list) -> float:
     return float(score)
 
 
-def _ai_danger_level(score: float) -> str:
-    # Returns: 'safe', 'low', 'medium', 'high', 'critical'
+AI_DANGER_LEVELS = ("safe", "low", "medium", "high", "critical")
+AI_DANGER_THRESHOLDS = (0.3, 0.45, 0.6, 0.75)  # Lower bounds of low..critical
+AI_DANGER_LEVEL_INDEX = {name: i for i, name in enumerate(AI_DANGER_LEVELS)}
+AI_WORD_CHANGE_PROB_BY_DANGER = (0.55, 0.65, 0.78, 0.9, 0.97)  # Chance to change word after an elimination
+
+
+def _ai_danger_level_int(score: float) -> int:
+    # Returns 0..4, indexing AI_DANGER_LEVELS
     try:
         s = float(score)
     except Exception:
         s = 0.0
-    if s < 0.3:
-        return "safe"
-    if s < 0.45:
-        return "low"
-    if s < 0.6:
-        return "medium"
-    if s < 0.75:
-        return "high"
-    return "critical"
+    return bisect.bisect_right(AI_DANGER_THRESHOLDS, s)
 
 
-def _ai_is_panic(danger_level: str, panic_threshold: str) -> bool:
-    """Return True if danger_level is >= panic_threshold (ordered)."""
-    order = {"safe": 0, "low": 1, "medium": 2, "high": 3, "critical": 4}
-    return order.get(danger_level, 0) >= order.get(panic_threshold, 4)
+def _ai_is_panic(danger_level: int, panic_threshold: int) -> bool:
+    """Return True if danger_level is >= panic_threshold (both AI_DANGER_LEVELS indices)."""
+    return danger_level >= panic_threshold
 
 
-def _ai_self_similarity(ai_player: dict, word: str, game: dict = None) -> Optional[float]:
-    """Cosine similarity between a candidate guess and the AI's own secret embedding."""
+def _ai_self_similarities(ai_player: dict, game: dict, words: list) -> np.ndarray:
+    """
+    Cosine similarity of each candidate word to the AI's own secret.
+    
+    Reads one row of the dense similarity matrix for the AI's secret; words
+    the matrix can't answer fall back to a single embedding matmul. Unknown
+    similarities are 0.0.
+    """
+    self_sims = np.zeros(len(words))
+    my_secret = (ai_player.get("secret_word") or "").lower().strip()
+    if not my_secret or not words:
+        return self_sims
+    
+    missing = np.ones(len(words), dtype=bool)
+    word_to_idx, sims = _theme_sim_index(game)
+    secret_idx = word_to_idx.get(my_secret) if sims is not None else None
+    if secret_idx is not None:
+        idxs = np.fromiter((word_to_idx.get(w.lower(), -1) for w in words), dtype=np.intp, count=len(words))
+        known = idxs >= 0
+        row = sims[secret_idx, idxs[known]]
+        found = ~np.isnan(row)
+        self_sims[np.flatnonzero(known)[found]] = row[found]
+        missing[np.flatnonzero(known)[found]] = False
+    
+    if not missing.any():
+        return self_sims
+    
+    # Fallback: cosine against cached embeddings (one fetch for the whole batch)
     try:
-        my_secret = (ai_player.get("secret_word") or "").lower().strip()
-        word_lower = word.lower()
-        
-        # Fast path: use pre-computed similarity matrix
-        if game and my_secret:
-            matrix = game.get('theme_similarity_matrix')
-            if matrix and my_secret in matrix:
-                sim = matrix[my_secret].get(word_lower)
-                if sim is not None:
-                    return float(sim)
-        
-        # Fallback: compute similarity from embeddings (lookup from cache)
-        if not my_secret:
-            return None
-        
         try:
             secret_emb = get_embedding(my_secret)
         except Exception:
             # Legacy fallback: use stored embedding if cache miss
             secret_emb = ai_player.get("secret_embedding")
+        if secret_emb is None:
+            return self_sims
         
-        if not secret_emb:
-            return None
-        
-        # Try cached embedding first
-        if game:
-            theme_embeddings = get_theme_embeddings(game)
-            emb = theme_embeddings.get(word_lower)
-            if emb:
-                return float(cosine_similarity(emb, secret_emb))
+        theme_embeddings = get_theme_embeddings(game) if game else {}
+        rows = []
+        embs = []
+        for i in np.flatnonzero(missing):
+            emb = theme_embeddings.get(words[i].lower())
+            if emb is None:
+                try:
+                    emb = get_embedding(words[i], game)
+                except Exception:
+                    continue
+            rows.append(i)
+            embs.append(emb)
         
-        emb = get_embedding(word, game)
-        return float(cosine_similarity(emb, secret_emb))
+        if embs:
+            emb_matrix = np.asarray(embs, dtype=np.float64)
+            secret_vec = np.asarray(secret_emb, dtype=np.float64)
+            norms = np.linalg.norm(emb_matrix, axis=1) * np.linalg.norm(secret_vec)
+            dots = emb_matrix @ secret_vec
+            self_sims[rows] = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
     except Exception:
-        return None
+        pass
+    
+    return self_sims
 
 
 # ============== AI REALISM HELPERS ==============
 
-def _ai_get_personality_modifiers(ai_player: dict) -> dict:
-    """Get personality modifiers for an AI player."""
+AI_NEUTRAL_PERSONALITY = {
+    "random_chance_mod": 0.0,
+    "targeting_boost": 0.0,
+    "self_leak_tolerance": 0.0,
+    "think_time_mod": 1.0,
+}
+
+
+def _ai_resolved(ai_player: dict) -> dict:
+    """
+    Static per-AI config lookups, resolved once and kept on ai_player['_resolved'].
+    
+    Keys: config, personality_mods, mistakes (None if the AI never makes
+    mistakes), timing, is_nemesis, chat_chance, panic_level (AI_DANGER_LEVELS
+    index of config['panic_danger']). Re-resolved if difficulty or personality
+    changes; stripped by save_game.
+    """
     difficulty = ai_player.get("difficulty", "rookie")
+    personality = ai_player.get("personality", "methodical")
+    resolved = ai_player.get('_resolved')
+    if resolved is not None and resolved['key'] == (difficulty, personality):
+        return resolved
+    
     config = AI_DIFFICULTY_CONFIG.get(difficulty, {})
+    is_nemesis = difficulty == "nemesis"
     
-    # Nemesis has no personality - return neutral modifiers
-    if config.get("has_personality") is False or difficulty == "nemesis":
-        return {
-            "random_chance_mod": 0.0,
-            "targeting_boost": 0.0,
-            "self_leak_tolerance": 0.0,
-            "think_time_mod": 1.0,
-        }
+    # Nemesis has no personality - neutral modifiers
+    if config.get("has_personality") is False or is_nemesis:
+        personality_mods = AI_NEUTRAL_PERSONALITY
+    else:
+        personality_mods = AI_PERSONALITY_CONFIG.get(personality, AI_DEFAULT_PERSONALITY_CONFIG)
     
-    personality = ai_player.get("personality", "methodical")
-    return AI_PERSONALITY_CONFIG.get(personality, AI_PERSONALITY_CONFIG["methodical"])
+    # Nemesis never makes mistakes
+    if is_nemesis or config.get("makes_mistakes") is False:
+        mistakes = None
+    else:
+        mistakes = AI_MISTAKE_CONFIG.get(difficulty, AI_DEFAULT_MISTAKE_CONFIG)
+    
+    # Higher difficulties chat less (more stoic); personality affects chat frequency
+    chat_chance = AI_CHAT_CHANCE.get(difficulty, 0.3) * AI_CHAT_PERSONALITY_MULT.get(personality, 1.0)
+    
+    panic_danger = str(config.get("panic_danger", "high") or "high")
+    
+    resolved = {
+        'key': (difficulty, personality),
+        'config': config,
+        'personality_mods': personality_mods,
+        'mistakes': mistakes,
+        'timing': AI_TIMING_CONFIG.get(difficulty, AI_DEFAULT_TIMING_CONFIG),
+        'is_nemesis': is_nemesis,
+        'chat_chance': chat_chance,
+        'panic_level': AI_DANGER_LEVEL_INDEX.get(panic_danger, len(AI_DANGER_LEVELS) - 1),
+    }
+    ai_player['_resolved'] = resolved
+    return resolved
+
+
+def _ai_get_personality_modifiers(ai_player: dict) -> dict:
+    """Get personality modifiers for an AI player."""
+    return _ai_resolved(ai_player)['personality_mods']
 
 
 def _ai_calculate_think_time(ai_player: dict, is_strategic: bool, is_panicking: bool) -> int:
     """Calculate how long the AI should 'think' before making a move (in ms)."""
-    import random
-    
-    difficulty = ai_player.get("difficulty", "rookie")
-    timing = AI_TIMING_CONFIG.get(difficulty, AI_TIMING_CONFIG["rookie"])
-    personality_mods = _ai_get_personality_modifiers(ai_player)
+    resolved = _ai_resolved(ai_player)
+    timing = resolved['timing']
+    personality_mods = resolved['personality_mods']
     
     # Base think time range
     if is_strategic:
@@ -2136,20 +2639,13 @@ def _ai_calculate_think_time(ai_player: dict, is_strategic: bool, is_panicking:
 
 def _ai_should_make_mistake(ai_player: dict, mistake_type: str, is_panicking: bool = False) -> bool:
     """Check if the AI should make a specific type of mistake."""
-    import random
-    
-    difficulty = ai_player.get("difficulty", "rookie")
+    resolved = _ai_resolved(ai_player)
     
-    # Nemesis never makes mistakes
-    if difficulty == "nemesis":
+    # Nemesis (and any difficulty with makes_mistakes=False) never makes mistakes
+    mistakes = resolved['mistakes']
+    if mistakes is None:
         return False
     
-    config = AI_DIFFICULTY_CONFIG.get(difficulty, {})
-    if config.get("makes_mistakes") is False:
-        return False
-    
-    mistakes = AI_MISTAKE_CONFIG.get(difficulty, AI_MISTAKE_CONFIG["rookie"])
-    
     base_chance = mistakes.get(mistake_type, 0.0)
     
     # Panic increases mistake chance
@@ -2159,7 +2655,7 @@ def _ai_should_make_mistake(ai_player: dict, mistake_type: str, is_panicking: bo
         base_chance = min(0.8, base_chance * 1.2)
     
     # Personality affects some mistakes
-    personality_mods = _ai_get_personality_modifiers(ai_player)
+    personality_mods = resolved['personality_mods']
     if mistake_type == "overconfident_guess" and personality_mods.get("self_leak_tolerance", 0) > 0:
         base_chance = min(0.5, base_chance * 1.3)  # Aggressive types more prone
     
@@ -2193,30 +2689,50 @@ def _ai_update_streak(ai_player: dict, guess_result: str):
     ai_player["ai_memory"] = memory
 
 
+AI_GRUDGE_DECAY = 0.05  # Grudge lost per grudge update in which the player wasn't the attacker
+
+
+def _ai_grudge_value(entry, tick: int) -> float:
+    """
+    Effective grudge strength at a given grudge tick.
+    
+    Decay is applied lazily from the tick of the last write; legacy plain
+    floats (stored before lazy decay) are treated as current.
+    """
+    if not isinstance(entry, dict):
+        return float(entry or 0.0)
+    return max(0.0, entry.get("v", 0.0) - AI_GRUDGE_DECAY * (tick - entry.get("t", tick)))
+
+
 def _ai_update_grudge(ai_player: dict, attacker_id: str, similarity: float):
-    """Update grudge against a player who targeted this AI."""
+    """Update grudge against a player who targeted this AI.
+    
+    Every other grudge decays by AI_GRUDGE_DECAY per update; rather than
+    touching each one, the update only bumps memory['grudge_tick'] and
+    _ai_grudge_value applies the decay on read.
+    """
     memory = ai_player.get("ai_memory", {})
     grudges = memory.get("grudges", {})
-    
-    # High similarity attacks build grudge
-    if similarity > 0.6:
-        current_grudge = grudges.get(attacker_id, 0.0)
-        grudge_increase = (similarity - 0.5) * 0.5  # 0.6 sim = +0.05, 0.9 sim = +0.2
-        grudges[attacker_id] = min(1.0, current_grudge + grudge_increase)
-    
-    # Grudges decay slightly over time
-    for pid in list(grudges.keys()):
-        if pid != attacker_id:
-            grudges[pid] = max(0, grudges[pid] - 0.05)
-    
+    if "grudge_tick" not in memory:
+        # Legacy memory: plain float grudges, current as of now
+        grudges = {pid: {"v": _ai_grudge_value(entry, 0), "t": 0} for pid, entry in grudges.items()}
+    tick = int(memory.get("grudge_tick", 0) or 0)
+    
+    # The attacker's grudge doesn't decay this update (it only grows on high similarity)
+    if attacker_id in grudges or similarity > 0.6:
+        current_grudge = _ai_grudge_value(grudges.get(attacker_id), tick)
+        if similarity > 0.6:
+            grudge_increase = (similarity - 0.5) * 0.5  # 0.6 sim = +0.05, 0.9 sim = +0.2
+            current_grudge = min(1.0, current_grudge + grudge_increase)
+        grudges[attacker_id] = {"v": current_grudge, "t": tick + 1}
+    
+    memory["grudge_tick"] = tick + 1
     memory["grudges"] = grudges
     ai_player["ai_memory"] = memory
 
 
 def _ai_select_target_by_personality(ai_player: dict, game: dict, available_targets: list) -> Optional[dict]:
     """Select a target based on AI personality preference."""
-    import random
-    
     if not available_targets:
         return None
     
@@ -2227,8 +2743,10 @@ def _ai_select_target_by_personality(ai_player: dict, game: dict, available_targ
     
     # Check for grudge override (personality-independent revenge)
     if grudges:
-        max_grudge_id = max(grudges.keys(), key=lambda k: grudges[k])
-        if grudges[max_grudge_id] > 0.5:
+        tick = int(memory.get("grudge_tick", 0) or 0)
+        grudge_values = {pid: _ai_grudge_value(entry, tick) for pid, entry in grudges.items()}
+        max_grudge_id = max(grudge_values.items(), key=itemgetter(1))[0]
+        if grudge_values[max_grudge_id] > 0.5:
             # Strong grudge - 40% chance to target them instead
             if random.random() < 0.4:
                 grudge_target = next((t for t in available_targets if t.get("player_id") == max_grudge_id), None)
@@ -2241,7 +2759,8 @@ def _ai_select_target_by_personality(ai_player: dict, game: dict, available_targ
     elif preference == "leader":
         # Target player with most eliminations (or first in turn order as proxy)
         # For now, just pick the one with highest danger to others
-        return max(available_targets, key=lambda t: t.get("score", 0))
+        scores = [t.get("score", 0) for t in available_targets]
+        return max(zip(scores, available_targets), key=itemgetter(0))[1]
     
     elif preference == "safe":
         # Target already-exposed players (high danger score)
@@ -2252,11 +2771,16 @@ def _ai_select_target_by_personality(ai_player: dict, game: dict, available_targ
     
     elif preference == "weakest":
         # Target player closest to elimination (highest danger)
-        return max(available_targets, key=lambda t: t.get("top_similarity", 0))
+        top_sims = [t.get("top_similarity", 0) for t in available_targets]
+        return max(zip(top_sims, available_targets), key=itemgetter(0))[1]
     
     elif preference == "vulnerable":
         # Same as weakest but with some randomness
-        sorted_targets = sorted(available_targets, key=lambda t: t.get("top_similarity", 0), reverse=True)
+        ranked = sorted(
+            ((t.get("top_similarity", 0), t) for t in available_targets),
+            key=itemgetter(0), reverse=True,
+        )
+        sorted_targets = [t for _, t in ranked]
         top_half = sorted_targets[:max(1, len(sorted_targets) // 2)]
         return random.choice(top_half)
     
@@ -2265,16 +2789,14 @@ def _ai_select_target_by_personality(ai_player: dict, game: dict, available_targ
 
 def _ai_maybe_bluff(ai_player: dict, game: dict, available_words: list) -> Optional[str]:
     """Occasionally guess a word near own secret to mislead opponents."""
-    import random
-    
     difficulty = ai_player.get("difficulty", "rookie")
-    config = AI_DIFFICULTY_CONFIG.get(difficulty, {})
+    resolved = _ai_resolved(ai_player)
     
     # Nemesis never bluffs - pure optimization only
-    if config.get("uses_bluffing") is False or difficulty == "nemesis":
+    if resolved['config'].get("uses_bluffing") is False or resolved['is_nemesis']:
         return None
     
-    personality_mods = _ai_get_personality_modifiers(ai_player)
+    personality_mods = resolved['personality_mods']
     
     # Only higher difficulties bluff, and only certain personalities
     bluff_base_chance = {
@@ -2302,18 +2824,14 @@ def _ai_maybe_bluff(ai_player: dict, game: dict, available_words: list) -> Optio
     my_secret_lower = my_secret.lower()
     
     try:
-        # Fast path: use pre-computed similarity matrix
-        matrix = game.get('theme_similarity_matrix') if game else None
-        if matrix and my_secret_lower in matrix:
-            bluff_candidates = []
-            for word in available_words[:30]:  # Sample for performance
-                word_lower = word.lower()
-                sim = matrix[my_secret_lower].get(word_lower)
-                if sim is not None and 0.5 < sim < 0.75:
-                    bluff_candidates.append((word, sim))
-            
+        # Fast path: one row of the pre-computed similarity matrix
+        sample = available_words[:30]  # Sample for performance
+        row = _theme_sim_row(game, my_secret_lower, [w.lower() for w in sample]) if game else None
+        if row is not None:
+            # Missing pairs are NaN and fail both comparisons
+            bluff_candidates = [sample[i] for i in _indices_in_range(row, 0.5, 0.75)]
             if bluff_candidates:
-                return random.choice(bluff_candidates)[0]
+                return random.choice(bluff_candidates)
             return None
         
         # Fallback: use embeddings (rare - only if matrix not available)
@@ -2322,25 +2840,28 @@ def _ai_maybe_bluff(ai_player: dict, game: dict, available_words: list) -> Optio
         except Exception:
             my_embedding = ai_player.get("secret_embedding")
         
-        if not my_embedding:
+        if my_embedding is None:
             return None
         
-        # Use cached embeddings if available
-        theme_embeddings = get_theme_embeddings(game)
+        # Use cached embeddings if available (one matvec over the sample)
+        emb_index, unit = _theme_embedding_index(game)
+        emb_index = emb_index or {}
+        my_vec = _unit_vector(my_embedding)
+        
+        idxs = np.fromiter((emb_index.get(w.lower(), -1) for w in sample), dtype=np.intp, count=len(sample))
+        known = idxs >= 0
+        sims = np.empty(len(sample))
+        if known.any():
+            sims[known] = _cosine_matvec(unit[idxs[known]], my_vec)
+        for i in np.flatnonzero(~known):
+            sims[i] = cosine_similarity(my_vec, get_embedding(sample[i], game))
         
-        bluff_candidates = []
-        for word in available_words[:30]:  # Sample for performance
-            word_emb = theme_embeddings.get(word.lower())
-            if not word_emb:
-                word_emb = get_embedding(word, game)
-            sim = cosine_similarity(my_embedding, word_emb)
-            # Sweet spot: 0.5-0.75 similarity (close enough to mislead, not too close to self-eliminate)
-            if 0.5 < sim < 0.75:
-                bluff_candidates.append((word, sim))
+        # Sweet spot: 0.5-0.75 similarity (close enough to mislead, not too close to self-eliminate)
+        bluff_candidates = [sample[i] for i in _indices_in_range(sims, 0.5, 0.75)]
         
         if bluff_candidates:
             # Pick one randomly from the bluff candidates
-            return random.choice(bluff_candidates)[0]
+            return random.choice(bluff_candidates)
     except Exception:
         pass
     
@@ -2377,30 +2898,11 @@ def _ai_adapt_to_player(ai_player: dict, game: dict, player_id: str):
 
 def _ai_generate_chat_message(ai_player: dict, trigger: str, context: dict = None) -> Optional[str]:
     """Generate a contextual chat message for the AI."""
-    import random
-    
-    messages = AI_CHAT_MESSAGES.get(trigger, [])
+    messages = AI_CHAT_MESSAGES.get(trigger)
     if not messages:
         return None
     
-    # Higher difficulties chat less (more stoic)
-    difficulty = ai_player.get("difficulty", "rookie")
-    chat_chance = {
-        "rookie": 0.6,
-        "analyst": 0.45,
-        "field-agent": 0.35,
-        "spymaster": 0.25,
-        "ghost": 0.15,
-    }.get(difficulty, 0.3)
-    
-    # Personality affects chat frequency
-    personality = ai_player.get("personality", "methodical")
-    if personality == "chaotic":
-        chat_chance *= 1.5
-    elif personality == "cautious":
-        chat_chance *= 0.7
-    
-    if random.random() >= chat_chance:
+    if random.random() >= _ai_resolved(ai_player)['chat_chance']:
         return None
     
     message = random.choice(messages)
@@ -2438,30 +2940,26 @@ def ai_choose_guess(ai_player: dict, game: dict) -> Optional[str]:
     - Avoid guessing words that have already been guessed
     - Higher difficulty = smarter targeting
     """
-    import random
-    
     difficulty = ai_player.get("difficulty", "rookie")
-    default_cfg = AI_DIFFICULTY_CONFIG.get("rookie") or {}
-    config = AI_DIFFICULTY_CONFIG.get(difficulty, default_cfg)
     
     # Nemesis uses completely different strategy
     if difficulty == "nemesis":
         return _nemesis_choose_guess(ai_player, game)
     
+    config = AI_DIFFICULTY_CONFIG.get(difficulty, AI_DEFAULT_DIFFICULTY_CONFIG)
+    
     theme_words = game.get("theme", {}).get("words", [])
+    theme_lower = _theme_words_lower(game)
     my_secret = (ai_player.get("secret_word") or "").lower().strip()
     matrix = game.get('theme_similarity_matrix', {})
     
     # Get all previously guessed words from history
-    guessed_words = set()
-    for entry in game.get('history', []):
-        word = entry.get('word', '').lower()
-        if word:
-            guessed_words.add(word)
+    guessed_words = _history_word_index(game).all_guessed
     
     # Build available words (exclude own secret and already guessed words)
-    available_words = [w for w in theme_words 
-                       if w.lower() != my_secret and w.lower() not in guessed_words]
+    keep = [wl != my_secret and wl not in guessed_words for wl in theme_lower]
+    available_words = list(compress(theme_words, keep))
+    available_lower = list(compress(theme_lower, keep))
     if not available_words:
         return None
     
@@ -2472,37 +2970,27 @@ def ai_choose_guess(ai_player: dict, game: dict) -> Optional[str]:
         # Look at recent history for high-similarity guesses against opponents
         best_clue = None
         best_sim = 0.0
+        ai_id = ai_player.get("id")
+        alive_ids = _alive_player_ids(game)[1]
         
-        for entry in reversed(game.get("history", [])[-20:]):
-            word = entry.get("word", "").lower()
-            sims = entry.get("similarities", {})
-            for pid, sim in sims.items():
-                # Skip self
-                if pid == ai_player.get("id"):
-                    continue
-                # Check if this player is still alive
-                player = next((p for p in game["players"] if p["id"] == pid and p.get("is_alive")), None)
-                if player and sim > best_sim:
-                    best_sim = sim
-                    best_clue = word
+        # Skip self and players who are already out
+        best = max((v for pid, v in _recent_best_clues(game).items()
+                    if pid != ai_id and pid in alive_ids), default=None)
+        if best is not None:
+            best_sim, best_clue = best[0], best[3]
         
         # If we found a good clue, pick a similar word
-        if best_clue and best_sim > 0.4 and best_clue in matrix:
-            # Get words similar to the clue
-            clue_sims = matrix[best_clue]
-            candidates = []
-            for w in available_words:
-                wl = w.lower()
-                if wl == best_clue:
-                    continue  # Don't repeat the exact clue
-                sim = clue_sims.get(wl, 0)
-                candidates.append((w, sim))
-            
-            if candidates:
-                candidates.sort(key=lambda x: x[1], reverse=True)
+        clue_row = _theme_sim_row(game, best_clue, available_lower) if best_clue and best_sim > 0.4 else None
+        if clue_row is not None:
+            # Get words similar to the clue (don't repeat the exact clue)
+            keep = np.fromiter((wl != best_clue for wl in available_lower), dtype=bool, count=len(available_lower))
+            candidates = np.flatnonzero(keep)
+            
+            if len(candidates):
                 # Pick from top candidates with some randomness
-                top_n = min(5, len(candidates))
-                return random.choice(candidates[:top_n])[0]
+                clue_sims = np.nan_to_num(clue_row[candidates], nan=0.0)
+                top = candidates[_top_k_indices(clue_sims, 5)]
+                return random.choice([available_words[i] for i in top])
     
     # Random guess
     return random.choice(available_words)
@@ -2514,8 +3002,6 @@ def ai_change_word(ai_player: dict, game: dict) -> Optional[str]:
     If the AI's original word pool is exhausted, regenerate a fresh sample from the theme.
     Excludes current secret words of OTHER players AND previously guessed words.
     """
-    import random
-    
     # Get current secret words of OTHER players
     current_secrets = set()
     ai_id = ai_player.get("id")
@@ -2524,28 +3010,25 @@ def ai_change_word(ai_player: dict, game: dict) -> Optional[str]:
             current_secrets.add(p["secret_word"].lower())
     
     # Get all previously guessed words from history
-    guessed_words = set()
-    for entry in game.get('history', []):
-        word = entry.get('word', '').lower()
-        if word:
-            guessed_words.add(word)
+    guessed_words = _history_word_index(game).all_guessed
+    
+    excluded = current_secrets | guessed_words
     
     # First try: use AI's existing word pool, filtered to exclude current secrets and guessed words
     word_pool = ai_player.get("word_pool", [])
-    available_words = [w for w in word_pool 
-                       if w.lower() not in current_secrets and w.lower() not in guessed_words]
+    available_words = [w for w in word_pool if w.lower() not in excluded]
     
     # If pool exhausted, regenerate from theme
     if not available_words:
         all_theme_words = (game.get("theme", {}) or {}).get("words", [])
-        available_words = [w for w in all_theme_words 
-                          if w.lower() not in current_secrets and w.lower() not in guessed_words]
+        available_words = list(compress(all_theme_words, [wl not in excluded for wl in _theme_words_lower(game)]))
         
         # Update AI's word pool with a fresh sample
         if len(available_words) > WORDS_PER_PLAYER:
             new_pool = random.sample(available_words, WORDS_PER_PLAYER)
             ai_player["word_pool"] = sorted(new_pool)
             available_words = new_pool
+            _prewarm_embeddings(new_pool)
     
     if not available_words:
         return None
@@ -2562,62 +3045,51 @@ def process_ai_turn(game: dict, ai_player: dict) -> Optional[dict]:
     - Grudge tracking
     - Chat message generation
     """
-    import random
-    
     if not ai_player.get("is_ai") or not ai_player.get("is_alive"):
         return None
     
     ai_state = ai_player.get("ai_state", {})
     
-    # Choose a guess
-    guess_word = ai_choose_guess(ai_player, game)
+    # Choose a guess (dispatch on difficulty once; nemesis has its own chooser)
+    if _ai_resolved(ai_player)['is_nemesis']:
+        guess_word = _nemesis_choose_guess(ai_player, game)
+    else:
+        guess_word = ai_choose_guess(ai_player, game)
     if not guess_word:
         return None
     
     guess_lower = guess_word.lower()
     
     # Calculate similarities - use pre-computed matrix for speed
-    similarities = {}
-    matrix = game.get('theme_similarity_matrix')
+    similarities, fallback_players = _guess_similarities(game, guess_lower)
     
-    for p in game["players"]:
-        secret = p.get("secret_word", "").lower()
-        if not secret:
-            continue
-        
-        # Fast path: use matrix
-        if matrix and guess_lower in matrix:
-            sim = matrix[guess_lower].get(secret)
-            if sim is not None:
-                similarities[p["id"]] = round(sim, 4)
-                continue
-        
-        # Fallback: compute from embeddings (should be rare)
-        guess_emb = p.get("_guess_emb")
-        if not guess_emb:
-            try:
-                guess_emb = get_embedding(guess_word)
-            except Exception:
-                continue
-        
-        # Look up secret embedding from cache
+    # Fallback: compute from embeddings (should be rare) - one matvec over stacked secrets
+    if fallback_players:
         try:
-            secret_emb = get_embedding(secret)
+            guess_vec = np.asarray(get_embedding(guess_word), dtype=np.float64)
         except Exception:
-            # Legacy fallback
-            secret_emb = p.get("secret_embedding")
+            guess_vec = None
         
-        if secret_emb:
-            sim = cosine_similarity(guess_emb, secret_emb)
-            similarities[p["id"]] = round(sim, 4)
+        if guess_vec is not None:
+            guess_norm = np.linalg.norm(guess_vec)
+            if guess_norm:
+                guess_vec = guess_vec / guess_norm
+            secret_ids, secret_unit = _secret_embedding_matrix(game, fallback_players)
+            if secret_ids:
+                fallback_sims = dict(zip(secret_ids, np.round(secret_unit @ guess_vec, 4).tolist()))
+                # Keep similarities in player order
+                similarities = {
+                    p["id"]: similarities[p["id"]] if p["id"] in similarities else fallback_sims[p["id"]]
+                    for p in game["players"]
+                    if p["id"] in similarities or p["id"] in fallback_sims
+                }
     
-    # Check for eliminations
+    # Check for eliminations (only players whose secret is the guess)
     eliminations = []
-    for p in game["players"]:
+    for p in _players_by_secret(game).get(guess_lower, ()):
         if p["id"] != ai_player["id"] and p.get("is_alive"):
-            if guess_lower == p.get("secret_word", "").lower():
-                p["is_alive"] = False
-                eliminations.append(p["id"])
+            p["is_alive"] = False
+            eliminations.append(p["id"])
     
     # If AI eliminated someone, they can change their word
     if eliminations:
@@ -2632,6 +3104,7 @@ def process_ai_turn(game: dict, ai_player: dict) -> Optional[dict]:
         "eliminations": eliminations,
     }
     game["history"].append(history_entry)
+    on_guess_recorded(game, history_entry)
     
     return {
         "word": guess_word,
@@ -2642,16 +3115,13 @@ def process_ai_turn(game: dict, ai_player: dict) -> Optional[dict]:
 
 def process_ai_word_change(game: dict, ai_player: dict) -> bool:
     """Process AI word change after elimination."""
-    import random
-    
     if not ai_player.get("can_change_word"):
         return False
     
-    difficulty = ai_player.get("difficulty", "rookie")
-    config = AI_DIFFICULTY_CONFIG.get(difficulty, AI_DIFFICULTY_CONFIG.get("rookie", {}))
+    resolved = _ai_resolved(ai_player)
 
     # Nemesis ALWAYS changes word and uses counter-intelligence strategy
-    if difficulty == "nemesis":
+    if resolved['is_nemesis']:
         # Get available words
         word_pool = ai_player.get("word_pool", [])
         current_secrets = set()
@@ -2661,24 +3131,20 @@ def process_ai_word_change(game: dict, ai_player: dict) -> bool:
                 current_secrets.add(p["secret_word"].lower())
         
         # Get all previously guessed words from history
-        guessed_words = set()
-        for entry in game.get('history', []):
-            word = entry.get('word', '').lower()
-            if word:
-                guessed_words.add(word)
+        guessed_words = _history_word_index(game).all_guessed
         
-        available_words = [w for w in word_pool 
-                          if w.lower() not in current_secrets and w.lower() not in guessed_words]
+        excluded = current_secrets | guessed_words
+        available_words = [w for w in word_pool if w.lower() not in excluded]
         
         # If pool exhausted, regenerate from theme
         if not available_words:
             all_theme_words = (game.get("theme", {}) or {}).get("words", [])
-            available_words = [w for w in all_theme_words 
-                              if w.lower() not in current_secrets and w.lower() not in guessed_words]
+            available_words = list(compress(all_theme_words, [wl not in excluded for wl in _theme_words_lower(game)]))
             if len(available_words) > WORDS_PER_PLAYER:
                 new_pool = random.sample(available_words, WORDS_PER_PLAYER)
                 ai_player["word_pool"] = sorted(new_pool)
                 available_words = new_pool
+                _prewarm_embeddings(new_pool)
         
         if available_words:
             # Use counter-intelligence word selection
@@ -2706,22 +3172,11 @@ def process_ai_word_change(game: dict, ai_player: dict) -> bool:
     # Strategic word change: if we're in danger, strongly prefer changing to reset opponents' intel.
     my_top = _ai_top_guesses_since_change(game, ai_player.get("id"), k=3)
     my_danger_score = _ai_danger_score(my_top)
-    my_danger_level = _ai_danger_level(my_danger_score)
-    panic_threshold = str(config.get("panic_danger", "high") or "high")
-    panic = _ai_is_panic(my_danger_level, panic_threshold)
-
-    # Baseline chance (keeps some variety/fun)
-    change_prob = 0.7
-    if my_danger_level == "safe":
-        change_prob = 0.55
-    elif my_danger_level == "low":
-        change_prob = 0.65
-    elif my_danger_level == "medium":
-        change_prob = 0.78
-    elif my_danger_level == "high":
-        change_prob = 0.9
-    elif my_danger_level == "critical":
-        change_prob = 0.97
+    my_danger_level = _ai_danger_level_int(my_danger_score)
+    panic = _ai_is_panic(my_danger_level, resolved['panic_level'])
+
+    # Baseline chance (keeps some variety/fun), by danger level
+    change_prob = AI_WORD_CHANGE_PROB_BY_DANGER[my_danger_level]
     if panic:
         change_prob = max(change_prob, 0.92)
 
@@ -2745,9 +3200,17 @@ def process_ai_word_change(game: dict, ai_player: dict) -> bool:
     return True
 
 
-# Initialise clients lazily
-_openai_client = None
-_redis_client = None
+# Clients are built once at import when configured (construction does no I/O);
+# the getters only construct lazily when the environment wasn't set at import.
+_openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY")) if os.getenv("OPENAI_API_KEY") else None
+_redis_client = (
+    Redis(
+        url=os.getenv("UPSTASH_REDIS_REST_URL"),
+        token=os.getenv("UPSTASH_REDIS_REST_TOKEN"),
+    )
+    if os.getenv("UPSTASH_REDIS_REST_URL") and os.getenv("UPSTASH_REDIS_REST_TOKEN")
+    else None
+)
 
 
 def get_openai_client():
@@ -2769,7 +3232,7 @@ def get_redis():
 
 # ============== RATE LIMITING ==============
 
-# Rate limiters (lazy initialized) - kept for backwards compatibility
+# Rate limiters (built at import when Redis is configured, lazily otherwise) - kept for backwards compatibility
 # New code should use security.rate_limiter module
 _ratelimit_general = None
 _ratelimit_game_create = None
@@ -2838,6 +3301,18 @@ def get_ratelimit_chat():
     return _ratelimit_chat
 
 
+if _redis_client is not None:
+    for _build_limiter in (
+        get_ratelimit_general,
+        get_ratelimit_game_create,
+        get_ratelimit_join,
+        get_ratelimit_guess,
+        get_ratelimit_chat,
+    ):
+        _build_limiter()
+    del _build_limiter
+
+
 def check_rate_limit(limiter, identifier: str) -> bool:
     """Returns True if request is allowed, False if rate limited."""
     try:
@@ -2884,6 +3359,41 @@ def get_client_ip(headers) -> str:
     return 'unknown'
 
 
+def _sanitize_theme_words(theme_data, use_50: bool) -> tuple:
+    """Sanitized word tuple for one PREGENERATED_THEMES entry."""
+    # Support both old format (list) and new format (dict with words/words_50)
+    if isinstance(theme_data, list):
+        raw_words = theme_data[:50] if use_50 else theme_data
+    else:
+        raw_words = theme_data.get("words_50" if use_50 else "words", [])
+
+    cleaned = []
+    seen = set()
+    for w in (raw_words or []):
+        token = str(w or "").strip().lower()
+        if not token:
+            continue
+        # Only allow words that match the game's input validation (letters only, 2-30 chars)
+        if not WORD_PATTERN.match(token):
+            continue
+        # Remove profane words from playable pools (chat filter is separate)
+        if token in PROFANITY_WORDS:
+            continue
+        if token in seen:
+            continue
+        seen.add(token)
+        cleaned.append(token)
+    return tuple(cleaned)
+
+
+# Themes are static, so sanitize every (theme, 50-word variant) once at import
+_SANITIZED_THEMES = {
+    (key, use_50): _sanitize_theme_words(theme_data, use_50)
+    for key, theme_data in PREGENERATED_THEMES.items()
+    for use_50 in (False, True)
+}
+
+
 def get_theme_words(category: str, word_count: int = 100) -> dict:
     """Get pre-generated theme words for a category.
     
@@ -2894,25 +3404,6 @@ def get_theme_words(category: str, word_count: int = 100) -> dict:
     Returns:
         Dict with 'name' and 'words' keys
     """
-    def _sanitize_theme_words(raw_words: list) -> list:
-        cleaned = []
-        seen = set()
-        for w in (raw_words or []):
-            token = str(w or "").strip().lower()
-            if not token:
-                continue
-            # Only allow words that match the game's input validation (letters only, 2-30 chars)
-            if not WORD_PATTERN.match(token):
-                continue
-            # Remove profane words from playable pools (chat filter is separate)
-            if token in PROFANITY_WORDS:
-                continue
-            if token in seen:
-                continue
-            seen.add(token)
-            cleaned.append(token)
-        return cleaned
-
     requested = str(category or "").strip()
     key = requested
     if key not in PREGENERATED_THEMES:
@@ -2923,14 +3414,8 @@ def get_theme_words(category: str, word_count: int = 100) -> dict:
             # Deterministic fallback for unknown themes (should be rare; mainly old lobbies).
             key = next(iter(PREGENERATED_THEMES.keys()))
 
-    theme_data = PREGENERATED_THEMES.get(key, {})
-    # Support both old format (list) and new format (dict with words/words_50)
-    if isinstance(theme_data, list):
-        raw_words = theme_data[:word_count] if word_count == 50 else theme_data
-    else:
-        raw_words = theme_data.get("words_50" if word_count == 50 else "words", [])
-    
-    words = _sanitize_theme_words(raw_words)
+    # Fresh list per call: games store and mutate their theme word list
+    words = list(_SANITIZED_THEMES.get((key, word_count == 50), ()))
     return {"name": key or requested, "words": words}
 
 
@@ -2959,6 +3444,12 @@ JWT_SECRET = _get_jwt_secret()
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRY_HOURS = 24 * 7  # 1 week
 JWT_REFRESH_THRESHOLD_HOURS = 24  # Refresh if less than 24h remaining
+JWT_VERIFIED_CACHE_MAX = 2048  # Process-local cache of already-verified tokens
+JWT_NOT_REVOKED_TTL_SECONDS = 30  # How long a "not revoked" Redis answer is trusted locally
+
+# Shared codec: decode options and the accepted-algorithms tuple are built once
+_JWT = jwt.PyJWT(options={"require": ["exp", "iat", "jti"]})
+_JWT_ALGS = (JWT_ALGORITHM,)
 
 # OAuth URLs
 GOOGLE_AUTH_URL = 'https://accounts.google.com/o/oauth2/v2/auth'
@@ -3020,22 +3511,67 @@ def create_jwt_token(user_data: dict, custom_expiry_hours: Optional[int] = None)
         'exp': now + (expiry_hours * 3600),
         'jti': jti,
     }
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return _JWT.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+# Tokens are immutable, so a verified signature stays verified until 'exp';
+# revocation is still checked on every call.
+_jwt_verified_cache = {}
+
+# jti -> monotonic deadline until which a "not revoked" answer is reused.
+# Revocations made by this process take effect immediately; ones made by
+# other instances are seen within JWT_NOT_REVOKED_TTL_SECONDS.
+_jwt_not_revoked_until = {}
+_jwt_revoked_local = set()
+
+
+def _is_jwt_revoked(jti: str) -> bool:
+    """is_token_revoked with a short-lived negative cache in front of Redis."""
+    if jti in _jwt_revoked_local:
+        return True
+    now = time.monotonic()
+    deadline = _jwt_not_revoked_until.get(jti)
+    if deadline is not None and deadline > now:
+        return False
+    if is_token_revoked(jti):
+        _jwt_not_revoked_until.pop(jti, None)
+        return True
+    if jti not in _jwt_not_revoked_until and len(_jwt_not_revoked_until) >= JWT_VERIFIED_CACHE_MAX:
+        del _jwt_not_revoked_until[next(iter(_jwt_not_revoked_until))]
+    _jwt_not_revoked_until[jti] = now + JWT_NOT_REVOKED_TTL_SECONDS
+    return False
+
+
+def _revoke_jwt(jti: str, ttl: int = None) -> bool:
+    """Revoke a token in Redis and in this process's caches."""
+    _jwt_not_revoked_until.pop(jti, None)
+    if len(_jwt_revoked_local) >= JWT_VERIFIED_CACHE_MAX:
+        _jwt_revoked_local.clear()
+    _jwt_revoked_local.add(jti)
+    return revoke_jwt_token(jti, ttl)
 
 
 def verify_jwt_token(token: str) -> Optional[dict]:
     """Verify and decode a JWT token. Returns None if invalid or revoked."""
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        # Check if token has been revoked
-        jti = payload.get('jti')
-        if jti and is_token_revoked(jti):
-            return None
-        return payload
-    except jwt.ExpiredSignatureError:
+    payload = _jwt_verified_cache.get(token)
+    if payload is not None and payload.get('exp', 0) <= time.time():
+        del _jwt_verified_cache[token]
         return None
-    except jwt.InvalidTokenError:
+    if payload is None:
+        try:
+            payload = _JWT.decode(token, JWT_SECRET, algorithms=_JWT_ALGS)
+        except jwt.ExpiredSignatureError:
+            return None
+        except jwt.InvalidTokenError:
+            return None
+        if len(_jwt_verified_cache) >= JWT_VERIFIED_CACHE_MAX:
+            del _jwt_verified_cache[next(iter(_jwt_verified_cache))]
+        _jwt_verified_cache[token] = payload
+    # Check if token has been revoked
+    jti = payload.get('jti')
+    if jti and _is_jwt_revoked(jti):
         return None
+    return dict(payload)
 
 
 def refresh_jwt_token_if_needed(token: str) -> Optional[str]:
@@ -3055,7 +3591,7 @@ def refresh_jwt_token_if_needed(token: str) -> Optional[str]:
     # Revoke old token
     old_jti = payload.get('jti')
     if old_jti:
-        revoke_jwt_token(old_jti, exp - now)
+        _revoke_jwt(old_jti, exp - now)
     
     # Create new token
     user_data = {
@@ -3074,21 +3610,48 @@ def refresh_jwt_token_if_needed(token: str) -> Optional[str]:
 SESSION_TOKEN_SECRET = os.getenv('SESSION_TOKEN_SECRET', '') or JWT_SECRET
 SESSION_TOKEN_EXPIRY_HOURS = 24  # Session tokens valid for 24 hours
 
+# Tokens are signed with keyed BLAKE2b (one C call) and carry a version prefix
+# on the signature ('b3.' + unpadded base64url digest). Unprefixed
+# HMAC-SHA256 tokens still verify until they expire.
+SESSION_TOKEN_SIG_VERSION = 'b3.'
+_SESSION_KEY_BYTES = SESSION_TOKEN_SECRET.encode()
+# BLAKE2b keys are capped at 64 bytes; longer secrets are hashed down
+_SESSION_BLAKE2_KEY = (
+    _SESSION_KEY_BYTES if len(_SESSION_KEY_BYTES) <= 64
+    else hashlib.blake2b(_SESSION_KEY_BYTES).digest()
+)
+# Legacy signer, keyed once at import; each signature copies it instead of re-keying SHA-256
+_SESSION_HMAC = hmac.new(_SESSION_KEY_BYTES, digestmod=hashlib.sha256)
+
+
+def _session_token_digest(payload: str) -> bytes:
+    """Return the 16-byte keyed-BLAKE2b digest for a session token payload."""
+    return hashlib.blake2b(payload.encode(), key=_SESSION_BLAKE2_KEY, digest_size=16).digest()
+
+
+def _legacy_session_token_digest(payload: str) -> bytes:
+    """Return the truncated HMAC-SHA256 digest used by unversioned tokens."""
+    mac = _SESSION_HMAC.copy()
+    mac.update(payload.encode())
+    return mac.digest()[:16]
+
+
+def _session_token_signature(payload: str) -> str:
+    """Return the versioned signature string for a session token payload."""
+    encoded = base64.urlsafe_b64encode(_session_token_digest(payload)).rstrip(b'=')
+    return SESSION_TOKEN_SIG_VERSION + encoded.decode('ascii')
+
 
 def generate_session_token(player_id: str, game_code: str) -> str:
     """
-    Generate an HMAC-signed session token for a player in a game.
+    Generate a signed session token for a player in a game.
     
-    Token format: {player_id}:{game_code}:{timestamp}:{signature}
-    The signature covers player_id, game_code, and timestamp to prevent tampering.
+    Token format: {player_id}:{game_code}:{timestamp}:b3.{signature}
+    The keyed-BLAKE2b signature covers player_id, game_code, and timestamp to prevent tampering.
     """
     timestamp = int(time.time())
     payload = f"{player_id}:{game_code}:{timestamp}"
-    signature = hmac.new(
-        SESSION_TOKEN_SECRET.encode(),
-        payload.encode(),
-        hashlib.sha256
-    ).hexdigest()[:32]
+    signature = _session_token_signature(payload)
     return f"{payload}:{signature}"
 
 
@@ -3136,13 +3699,21 @@ def verify_session_token(token: str, player_id: str, game_code: str) -> bool:
         
         # Recompute signature and verify (constant-time comparison)
         payload = f"{token_player_id}:{token_game_code}:{token_timestamp}"
-        expected_signature = hmac.new(
-            SESSION_TOKEN_SECRET.encode(),
-            payload.encode(),
-            hashlib.sha256
-        ).hexdigest()[:32]
+        try:
+            if token_signature.startswith(SESSION_TOKEN_SIG_VERSION):
+                encoded = token_signature[len(SESSION_TOKEN_SIG_VERSION):]
+                # Strict decode: urlsafe_b64decode silently drops non-alphabet characters
+                provided_digest = base64.b64decode(encoded + '=' * (-len(encoded) % 4), altchars=b'-_', validate=True)
+                expected_digest = _session_token_digest(payload)
+            else:
+                provided_digest = bytes.fromhex(token_signature)
+                expected_digest = _legacy_session_token_digest(payload)
+        except ValueError:
+            return False
         
-        if not constant_time_compare(token_signature, expected_signature):
+        if len(provided_digest) != 16:
+            return False
+        if not hmac.compare_digest(provided_digest, expected_digest):
             return False
         
         return True
@@ -3164,6 +3735,23 @@ def _get_admin_emails() -> list:
 
 ADMIN_EMAILS = _get_admin_emails()
 
+def _write_user(redis, user: dict) -> None:
+    """
+    SET the user record unless it is unchanged since this request loaded it.
+    
+    The payload read from Redis (or last written) is kept on the user dict as
+    '_loaded_payload', so the comparison is against this request's own
+    snapshot: an unchanged user is not written back over a newer record from
+    another request, and a changed one is always written.
+    """
+    # Runtime-only keys (starting with '_') are never persisted
+    payload = _json_dumps(_strip_runtime_keys(user))
+    if user.get('_loaded_payload') == payload:
+        return
+    redis.set(f"user:{user['id']}", payload)
+    user['_loaded_payload'] = payload
+
+
 def get_or_create_user(google_user: dict) -> dict:
     """Get existing user or create new one from Google user data."""
     redis = get_redis()
@@ -3176,7 +3764,8 @@ def get_or_create_user(google_user: dict) -> dict:
     # Check if user exists
     existing = redis.get(user_key)
     if existing:
-        user = json.loads(existing)
+        user = _json_loads(existing)
+        user['_loaded_payload'] = existing
         # Update name in case it changed (don't store Google avatar)
         user['name'] = google_user.get('name', user['name'])
         # Ensure cosmetics field exists for existing users
@@ -3215,7 +3804,7 @@ def get_or_create_user(google_user: dict) -> dict:
         if is_admin and not user.get('is_donor'):
             user['is_donor'] = True
             user['donation_date'] = int(time.time())
-        redis.set(user_key, json.dumps(user))
+        _write_user(redis, user)
         return user
     
     # Create new user
@@ -3236,7 +3825,7 @@ def get_or_create_user(google_user: dict) -> dict:
         'owned_cosmetics': {},
         'daily_quests': new_daily_quests_state(),
     }
-    redis.set(user_key, json.dumps(user))
+    _write_user(redis, user)
     
     # Add to users set for leaderboard
     redis.sadd('users:all', user_id)
@@ -3254,15 +3843,50 @@ def get_user_by_id(user_id: str) -> Optional[dict]:
     user_key = f"user:{user_id}"
     data = redis.get(user_key)
     if data:
-        return json.loads(data)
+        user = _json_loads(data)
+        user['_loaded_payload'] = data
+        return user
     return None
 
 
+# Active UserWriteBatch for the current request, if any
+_user_write_batch = contextvars.ContextVar('_user_write_batch', default=None)
+
+
+class UserWriteBatch:
+    """
+    Defer save_user calls made inside the block and write each touched user
+    once on exit. If the block raises, the deferred writes are dropped so a
+    half-applied update is never persisted.
+    
+        with UserWriteBatch():
+            ensure_daily_quests_today(user)
+            check_and_update_streak(user)
+    """
+
+    def __init__(self):
+        self.users = {}
+        self._token = None
+
+    def __enter__(self):
+        self._token = _user_write_batch.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _user_write_batch.reset(self._token)
+        if exc_type is None:
+            for user in self.users.values():
+                save_user(user)
+        return False
+
+
 def save_user(user: dict):
-    """Save user data."""
-    redis = get_redis()
-    user_key = f"user:{user['id']}"
-    redis.set(user_key, json.dumps(user))
+    """Save user data (no-op when nothing changed since it was loaded or last saved)."""
+    batch = _user_write_batch.get()
+    if batch is not None:
+        batch.users[user['id']] = user
+        return
+    _write_user(get_redis(), user)
 
 
 def get_user_display_name(user: dict) -> str:
@@ -3281,48 +3905,33 @@ def get_user_by_email(email: str) -> Optional[dict]:
     return None
 
 
-def get_user_cosmetics(user: dict, persist_changes: bool = True) -> dict:
-    """
-    Get user's equipped cosmetics with defaults for missing fields.
-
-    Also performs schema migration + enforcement so:
-    - removed/renamed cosmetics are mapped or reset
-    - premium cosmetics can't be used by non-donors when paywall is enabled
-    - grind-locked cosmetics can't be used without meeting requirements
-    
-    Args:
-        user: User dictionary
-        persist_changes: If True, save user when cosmetics are reset due to validation.
-                        Set to False for read-only operations.
-    """
-    if not isinstance(user, dict):
-        return DEFAULT_COSMETICS.copy()
+@lru_cache(maxsize=1)
+def _cosmetic_requirement_metrics() -> tuple:
+    """Stat metrics referenced by any catalog requirement (the only stats gating depends on)."""
+    metrics = set()
+    for catalog_key in COSMETIC_CATEGORY_TO_CATALOG_KEY.values():
+        category_items = COSMETICS_CATALOG.get(catalog_key)
+        if not isinstance(category_items, dict):
+            continue
+        for item in category_items.values():
+            reqs = item.get('requirements') if isinstance(item, dict) else None
+            if not isinstance(reqs, list):
+                continue
+            for req in reqs:
+                if isinstance(req, dict) and isinstance(req.get('metric'), str) and req.get('metric'):
+                    metrics.add(req['metric'])
+    return tuple(sorted(metrics))
 
-    cosmetics = user.get('cosmetics', {})
-    if not isinstance(cosmetics, dict):
-        cosmetics = {}
 
-    # Merge with defaults to ensure all fields exist
-    result = DEFAULT_COSMETICS.copy()
-    result.update(cosmetics)
+def _resolve_cosmetics_impl(result: dict, is_donor: bool, is_admin: bool, owned_cosmetics: dict, user_stats: dict) -> tuple:
+    """
+    Apply catalog validation and gating to an equipped-cosmetics payload.
 
-    # Track whether we need to persist a migrated/sanitized payload
+    Does not mutate its arguments. Returns (resolved_cosmetics, changed).
+    """
+    result = dict(result)
     changed = False
 
-    # Ensure schema version exists and is current
-    try:
-        stored_version = int(user.get('cosmetics_version', 1) or 1)
-    except Exception:
-        stored_version = 1
-    if stored_version != COSMETICS_SCHEMA_VERSION:
-        user['cosmetics_version'] = COSMETICS_SCHEMA_VERSION
-        changed = True
-
-    is_donor = bool(user.get('is_donor', False))
-    is_admin = bool(user.get('is_admin', False))
-    user_stats = get_user_stats(user)
-    owned_cosmetics = (ensure_user_economy(user, persist=False).get("owned_cosmetics") or {}) if isinstance(user, dict) else {}
-
     for category_key, catalog_key in COSMETIC_CATEGORY_TO_CATALOG_KEY.items():
         desired = result.get(category_key, DEFAULT_COSMETICS.get(category_key))
 
@@ -3381,6 +3990,90 @@ def get_user_cosmetics(user: dict, persist_changes: bool = True) -> dict:
                     changed = True
                 continue
 
+    return result, changed
+
+
+@lru_cache(maxsize=4096)
+def _resolve_cosmetics(cosmetics_items: tuple, is_donor: bool, is_admin: bool, owned_key: tuple, stats_key: tuple) -> tuple:
+    """
+    Memoized _resolve_cosmetics_impl keyed on hashable snapshots of its inputs.
+
+    owned_key holds each category's owned tuple (or None) in
+    COSMETIC_CATEGORY_TO_CATALOG_KEY order and stats_key the values of
+    _cosmetic_requirement_metrics(). Returns (resolved_items, changed).
+    """
+    owned_cosmetics = dict(zip(COSMETIC_CATEGORY_TO_CATALOG_KEY, (
+        list(owned) if owned is not None else None for owned in owned_key
+    )))
+    user_stats = dict(zip(_cosmetic_requirement_metrics(), stats_key))
+    result, changed = _resolve_cosmetics_impl(dict(cosmetics_items), is_donor, is_admin, owned_cosmetics, user_stats)
+    return tuple(result.items()), changed
+
+
+def get_user_cosmetics(user: dict, persist_changes: bool = True) -> dict:
+    """
+    Get user's equipped cosmetics with defaults for missing fields.
+
+    Also performs schema migration + enforcement so:
+    - removed/renamed cosmetics are mapped or reset
+    - premium cosmetics can't be used by non-donors when paywall is enabled
+    - grind-locked cosmetics can't be used without meeting requirements
+    
+    Args:
+        user: User dictionary
+        persist_changes: If True, save user when cosmetics are reset due to validation.
+                        Set to False for read-only operations.
+    """
+    if not isinstance(user, dict):
+        return DEFAULT_COSMETICS.copy()
+
+    cosmetics = user.get('cosmetics', {})
+    if not isinstance(cosmetics, dict):
+        cosmetics = {}
+
+    # Merge with defaults to ensure all fields exist
+    result = DEFAULT_COSMETICS.copy()
+    result.update(cosmetics)
+
+    # Track whether we need to persist a migrated/sanitized payload
+    changed = False
+
+    # Ensure schema version exists and is current
+    try:
+        stored_version = int(user.get('cosmetics_version', 1) or 1)
+    except Exception:
+        stored_version = 1
+    if stored_version != COSMETICS_SCHEMA_VERSION:
+        user['cosmetics_version'] = COSMETICS_SCHEMA_VERSION
+        changed = True
+
+    is_donor = bool(user.get('is_donor', False))
+    is_admin = bool(user.get('is_admin', False))
+    user_stats = get_user_stats(user)
+    owned_cosmetics = (ensure_user_economy(user, persist=False).get("owned_cosmetics") or {}) if isinstance(user, dict) else {}
+
+    try:
+        cache_key = (
+            tuple(result.items()),
+            is_donor,
+            is_admin,
+            tuple(
+                tuple(owned) if isinstance(owned, list) else None
+                for owned in (owned_cosmetics.get(category_key) for category_key in COSMETIC_CATEGORY_TO_CATALOG_KEY)
+            ),
+            tuple(user_stats.get(metric, 0) for metric in _cosmetic_requirement_metrics()),
+        )
+        hash(cache_key)
+    except TypeError:
+        # Unhashable payload values: resolve without the memo
+        cache_key = None
+    if cache_key is not None:
+        resolved_items, gated = _resolve_cosmetics(*cache_key)
+        result = dict(resolved_items)
+    else:
+        result, gated = _resolve_cosmetics_impl(result, is_donor, is_admin, owned_cosmetics, user_stats)
+    changed = changed or gated
+
     if changed and persist_changes:
         user['cosmetics'] = result
         save_user(user)
@@ -3410,6 +4103,28 @@ def _normalize_wallet(wallet) -> dict:
     return {"credits": credits}
 
 
+_WALLET_KEYS = frozenset({'credits'})
+_DAILY_QUESTS_STATE_KEYS = frozenset({'date', 'quests'})
+
+
+def _wallet_is_canonical(wallet) -> bool:
+    """True if wallet is already exactly what _normalize_wallet would return."""
+    if not isinstance(wallet, dict) or wallet.keys() != _WALLET_KEYS:
+        return False
+    credits = wallet['credits']
+    return type(credits) is int and credits >= 0
+
+
+def _daily_quests_state_is_canonical(state) -> bool:
+    """True if state is already exactly what _normalize_daily_quests_state would return."""
+    return (
+        isinstance(state, dict)
+        and state.keys() == _DAILY_QUESTS_STATE_KEYS
+        and isinstance(state['date'], str)
+        and isinstance(state['quests'], list)
+    )
+
+
 def _normalize_owned_cosmetics(owned) -> dict:
     """Normalize owned cosmetics to {category_key: [cosmetic_id, ...]}."""
     if not isinstance(owned, dict):
@@ -3468,21 +4183,31 @@ def ensure_user_economy(user: dict, persist: bool = True) -> dict:
 
     changed = False
 
-    wallet_norm = _normalize_wallet(user.get('wallet', {}))
-    if user.get('wallet') != wallet_norm:
-        user['wallet'] = wallet_norm
-        changed = True
+    # Already-normalized fields (the steady state) are used as is, skipping the copy + compare
+    raw_wallet = user.get('wallet')
+    if _wallet_is_canonical(raw_wallet):
+        wallet_norm = raw_wallet
+    else:
+        wallet_norm = _normalize_wallet(raw_wallet)
+        if raw_wallet != wallet_norm:
+            user['wallet'] = wallet_norm
+            changed = True
 
-    owned_norm = _normalize_owned_cosmetics(user.get('owned_cosmetics', {}))
+    raw_owned = user.get('owned_cosmetics')
+    owned_norm = _normalize_owned_cosmetics(raw_owned)
     # Only compare dicts; if original isn't dict, it's definitely changed
-    if not isinstance(user.get('owned_cosmetics'), dict) or user.get('owned_cosmetics') != owned_norm:
+    if not isinstance(raw_owned, dict) or raw_owned != owned_norm:
         user['owned_cosmetics'] = owned_norm
         changed = True
 
-    daily_norm = _normalize_daily_quests_state(user.get('daily_quests'))
-    if not isinstance(user.get('daily_quests'), dict) or user.get('daily_quests') != daily_norm:
-        user['daily_quests'] = daily_norm
-        changed = True
+    raw_daily = user.get('daily_quests')
+    if _daily_quests_state_is_canonical(raw_daily):
+        daily_norm = raw_daily
+    else:
+        daily_norm = _normalize_daily_quests_state(raw_daily)
+        if not isinstance(raw_daily, dict) or raw_daily != daily_norm:
+            user['daily_quests'] = daily_norm
+            changed = True
 
     if changed and persist:
         save_user(user)
@@ -3518,15 +4243,31 @@ def add_user_credits(user: dict, delta: int, persist: bool = True) -> int:
     return int(new_credits)
 
 
+def _owned_cosmetic_sets(user: dict) -> dict:
+    """
+    Category -> frozenset of owned cosmetic ids, for O(1) ownership checks.
+    
+    Cached on user['_owned_cosmetics_sets'] (stripped by save_user) and
+    rebuilt whenever user['owned_cosmetics'] is replaced, as
+    ensure_user_economy and grant_owned_cosmetic do on any change.
+    """
+    cached = user.get('_owned_cosmetics_sets')
+    if cached is not None and cached[0] is user.get('owned_cosmetics'):
+        return cached[1]
+    ensure_user_economy(user, persist=False)
+    owned = user['owned_cosmetics']  # normalized by ensure_user_economy
+    sets = {k: frozenset(v) for k, v in owned.items()}
+    user['_owned_cosmetics_sets'] = (owned, sets)
+    return sets
+
+
 def user_owns_cosmetic(user: dict, category_key: str, cosmetic_id: str) -> bool:
     if not isinstance(category_key, str) or not isinstance(cosmetic_id, str):
         return False
-    econ = ensure_user_economy(user, persist=False)
-    owned = econ.get('owned_cosmetics') or {}
-    items = owned.get(category_key, [])
-    if not isinstance(items, list):
+    if not isinstance(user, dict):
         return False
-    return cosmetic_id in items
+    items = _owned_cosmetic_sets(user).get(category_key)
+    return items is not None and cosmetic_id in items
 
 
 def grant_owned_cosmetic(user: dict, category_key: str, cosmetic_id: str, persist: bool = True) -> bool:
@@ -3552,20 +4293,35 @@ def grant_owned_cosmetic(user: dict, category_key: str, cosmetic_id: str, persis
     current.append(cosmetic_id)
     owned[category_key] = current
     user['owned_cosmetics'] = _normalize_owned_cosmetics(owned)
+    user.pop('_owned_cosmetics_sets', None)
     if persist:
         save_user(user)
     return True
 
 
+# UTC day number (epoch seconds // 86400) -> 'YYYY-MM-DD'; a few days at most
+_UTC_DATE_CACHE = {}
+
+
+def _utc_date_str(day: int) -> str:
+    """Return the YYYY-MM-DD string for a UTC day number, formatting each day once."""
+    date_str = _UTC_DATE_CACHE.get(day)
+    if date_str is None:
+        date_str = time.strftime('%Y-%m-%d', time.gmtime(day * 86400))
+        if len(_UTC_DATE_CACHE) >= 4:
+            del _UTC_DATE_CACHE[min(_UTC_DATE_CACHE)]
+        _UTC_DATE_CACHE[day] = date_str
+    return date_str
+
+
 def utc_today_str() -> str:
     """Return today's date as YYYY-MM-DD in UTC."""
-    return time.strftime('%Y-%m-%d', time.gmtime())
+    return _utc_date_str(int(time.time()) // 86400)
 
 
 def utc_yesterday_str() -> str:
     """Return yesterday's date as YYYY-MM-DD in UTC."""
-    yesterday = time.time() - 86400
-    return time.strftime('%Y-%m-%d', time.gmtime(yesterday))
+    return _utc_date_str(int(time.time()) // 86400 - 1)
 
 
 # ============== STREAK SYSTEM FUNCTIONS ==============
@@ -3615,14 +4371,9 @@ def get_streak_multiplier(streak_count: int) -> float:
     """Get the credit multiplier for a given streak count."""
     if streak_count <= 0:
         return 1.0
-    # Find the highest applicable multiplier
-    best_mult = 1.0
-    for threshold, mult in sorted(STREAK_MULTIPLIERS.items()):
-        if streak_count >= threshold:
-            best_mult = mult
-        else:
-            break
-    return best_mult
+    # Highest threshold <= streak_count
+    i = bisect.bisect_right(_STREAK_THRESHOLDS, streak_count) - 1
+    return _STREAK_MULTS[i] if i >= 0 else 1.0
 
 
 def get_streak_milestone_bonus(streak_count: int) -> int:
@@ -3694,17 +4445,10 @@ def check_and_update_streak(user: dict, persist: bool = True) -> dict:
         credits_earned = int(STREAK_BASE_CREDITS * multiplier)
         milestone_bonus = get_streak_milestone_bonus(current_count)
         claimed_today = True
-        
-        # Add credits to wallet
-        ensure_user_economy(user, persist=False)
-        wallet = user.get('wallet', {})
-        if not isinstance(wallet, dict):
-            wallet = {}
-        try:
-            current_credits = int(wallet.get('credits', 0) or 0)
-        except Exception:
-            current_credits = 0
-        wallet['credits'] = current_credits + credits_earned + milestone_bonus
+        
+        # Add credits to wallet (ensure_user_economy guarantees {"credits": int >= 0})
+        wallet = ensure_user_economy(user, persist=False)['wallet']
+        wallet['credits'] += credits_earned + milestone_bonus
         user['wallet'] = wallet
     
     # Update streak data
@@ -3736,20 +4480,18 @@ def get_next_streak_info(streak_count: int) -> dict:
     # Find next multiplier increase
     next_mult_day = None
     next_mult_credits = current_credits
-    for threshold in sorted(STREAK_MULTIPLIERS.keys()):
-        if threshold > streak_count:
-            next_mult_day = threshold
-            next_mult_credits = int(STREAK_BASE_CREDITS * STREAK_MULTIPLIERS[threshold])
-            break
+    i = bisect.bisect_right(_STREAK_THRESHOLDS, streak_count)
+    if i < len(_STREAK_THRESHOLDS):
+        next_mult_day = _STREAK_THRESHOLDS[i]
+        next_mult_credits = int(STREAK_BASE_CREDITS * _STREAK_MULTS[i])
     
     # Find next milestone bonus
     next_milestone_day = None
     next_milestone_bonus = 0
-    for threshold in sorted(STREAK_MILESTONE_BONUSES.keys()):
-        if threshold > streak_count:
-            next_milestone_day = threshold
-            next_milestone_bonus = STREAK_MILESTONE_BONUSES[threshold]
-            break
+    i = bisect.bisect_right(_STREAK_MILESTONE_SORTED_KEYS, streak_count)
+    if i < len(_STREAK_MILESTONE_SORTED_KEYS):
+        next_milestone_day = _STREAK_MILESTONE_SORTED_KEYS[i]
+        next_milestone_bonus = STREAK_MILESTONE_BONUSES[next_milestone_day]
     
     return {
         "current_daily_credits": current_credits,
@@ -3760,12 +4502,33 @@ def get_next_streak_info(streak_count: int) -> dict:
     }
 
 
+@lru_cache(maxsize=256)
+def _daily_seed(seed_text: str) -> int:
+    """64-bit seed derived from seed_text (SHA-256 prefix)."""
+    digest = hashlib.sha256(seed_text.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big', signed=False)
+
+
 def _daily_rng(seed_text: str):
     """Deterministic RNG for daily content across serverless invocations."""
-    import random
-    digest = hashlib.sha256(seed_text.encode('utf-8')).digest()
-    seed_int = int.from_bytes(digest[:8], 'big', signed=False)
-    return random.Random(seed_int)
+    # Fresh Random per call (it is stateful); only the seed derivation is cached
+    return random.Random(_daily_seed(seed_text))
+
+
+def _build_daily_quest_fast(date_str: str, category: str, metric: str, target: int, reward_credits: int, title: str, description: str, quest_type: str = "daily") -> dict:
+    """Build a quest from already-normalized values (non-negative ints, plain strings)."""
+    return {
+        "id": f"{date_str}:{metric}:{target}:{quest_type}",
+        "category": category,
+        "metric": metric,
+        "title": title,
+        "description": description,
+        "target": target,
+        "progress": 0,
+        "reward_credits": reward_credits,
+        "claimed": False,
+        "quest_type": quest_type,  # "daily" or "weekly"
+    }
 
 
 def _build_daily_quest(date_str: str, category: str, metric: str, target: int, reward_credits: int, title: str, description: str, quest_type: str = "daily") -> dict:
@@ -3781,29 +4544,84 @@ def _build_daily_quest(date_str: str, category: str, metric: str, target: int, r
         target_int = 0
     if reward_int < 0:
         reward_int = 0
-    quest_id = f"{date_str}:{metric}:{target_int}:{quest_type}"
-    return {
-        "id": quest_id,
-        "category": str(category or ""),
-        "metric": str(metric or ""),
-        "title": str(title or ""),
-        "description": str(description or ""),
-        "target": int(target_int),
-        "progress": 0,
-        "reward_credits": int(reward_int),
-        "claimed": False,
-        "quest_type": quest_type,  # "daily" or "weekly"
-    }
+    return _build_daily_quest_fast(
+        date_str, str(category or ""), str(metric or ""), target_int, reward_int,
+        str(title or ""), str(description or ""), quest_type,
+    )
 
 
 def get_week_start_str() -> str:
     """Return the start of the current week (Monday) as YYYY-MM-DD in UTC."""
-    import datetime
-    now = datetime.datetime.utcnow()
-    # Monday = 0, Sunday = 6
-    days_since_monday = now.weekday()
-    monday = now - datetime.timedelta(days=days_since_monday)
-    return monday.strftime('%Y-%m-%d')
+    day = int(time.time()) // 86400
+    # Day 0 (1970-01-01) was a Thursday, so (day + 3) % 7 is days since Monday
+    return _utc_date_str(day - (day + 3) % 7)
+
+
+def _quest_desc_games(n: int) -> str:
+    return f"Play {n} multiplayer game{'s' if n != 1 else ''}"
+
+
+def _quest_desc_elims(n: int) -> str:
+    return f"Get {n} elimination{'s' if n != 1 else ''}"
+
+
+def _quest_desc_wins(n: int) -> str:
+    return f"Win {n} multiplayer game{'s' if n != 1 else ''}"
+
+
+# Daily quest templates per category:
+# (metric, base_target, scale_target_by_tier, base_reward, title, description or description(target))
+_DAILY_QUEST_DEFS = {
+    "engagement": (
+        ("mp_games", 2, True, 35, "RUN OPERATIONS", _quest_desc_games),
+        ("mp_games", 3, True, 55, "FIELD WORK", _quest_desc_games),
+        ("mp_games", 4, True, 75, "FULL SHIFT", _quest_desc_games),
+    ),
+    "combat": (
+        ("mp_elims", 2, True, 45, "TARGET PRACTICE", _quest_desc_elims),
+        ("mp_elims", 4, True, 70, "HUNTER MODE", _quest_desc_elims),
+        ("mp_elims", 6, True, 95, "EXECUTION ORDER", _quest_desc_elims),
+    ),
+    "victory": (
+        ("mp_wins", 1, False, 85, "SECURE THE WIN", _quest_desc_wins),
+        ("mp_wins", 2, True, 140, "DOMINATE", _quest_desc_wins),
+    ),
+    "ranked": (
+        ("ranked_games", 1, False, 90, "RANKED DEPLOYMENT", "Play 1 ranked game"),
+        ("ranked_wins", 1, False, 160, "RANKED VICTORY", "Win 1 ranked game"),
+    ),
+    "challenge": (
+        ("mp_elims_single", 2, False, 120, "DOUBLE KILL", "Get 2+ eliminations in one game"),
+        ("mp_elims_single", 3, False, 200, "TRIPLE THREAT", "Get 3+ eliminations in one game"),
+        ("mp_first_elim", 1, False, 80, "FIRST BLOOD", "Get the first elimination in a game"),
+        ("mp_flawless", 1, False, 250, "FLAWLESS", "Win without being eliminated"),
+    ),
+}
+
+
+# Quest tier -> (target multiplier, reward multiplier)
+_QUEST_TIER_MULTS = {
+    "new": (0.7, 0.8),  # Easier targets, slightly lower rewards
+    "mid": (1.0, 1.0),
+    "veteran": (1.3, 1.25),  # Harder targets, better rewards
+}
+
+
+@lru_cache(maxsize=4)
+def _quest_catalog_for_tier(tier: str) -> dict:
+    """Daily quest options per category, scaled for a tier: (metric, target, reward, title, description)."""
+    tier_mult, reward_mult = _QUEST_TIER_MULTS[tier]
+    catalog = {}
+    for cat, options in _DAILY_QUEST_DEFS.items():
+        built = []
+        for metric, base_target, scales, base_reward, title, desc in options:
+            target = max(1, int(base_target * tier_mult)) if scales else base_target
+            reward = max(10, int(base_reward * reward_mult))
+            if not isinstance(desc, str):
+                desc = desc(target)
+            built.append((metric, target, reward, title, desc))
+        catalog[cat] = tuple(built)
+    return catalog
 
 
 def generate_daily_quests_for_user(user: dict, date_str: str) -> list:
@@ -3827,16 +4645,11 @@ def generate_daily_quests_for_user(user: dict, date_str: str) -> list:
     # Veterans (50+ games) get harder quests with better rewards
     if total_games <= 10:
         tier = "new"
-        tier_mult = 0.7  # Easier targets
-        reward_mult = 0.8  # Slightly lower rewards
     elif total_games <= 50:
         tier = "mid"
-        tier_mult = 1.0
-        reward_mult = 1.0
     else:
         tier = "veteran"
-        tier_mult = 1.3  # Harder targets
-        reward_mult = 1.25  # Better rewards
+    catalog = _quest_catalog_for_tier(tier)
 
     # Base categories always present
     categories = ["engagement", "combat", "victory"]
@@ -3853,73 +4666,52 @@ def generate_daily_quests_for_user(user: dict, date_str: str) -> list:
     ranked_eligible = ranked_games > 0
 
     if ranked_eligible:
-        # 25% chance to include a ranked quest
-        if rng.random() < 0.25:
-            replace_idx = int(rng.random() * len(categories))
-            categories[replace_idx] = "ranked"
+        # 25% chance to include a ranked quest (2 random bits == 0)
+        if not rng.getrandbits(2):
+            categories[rng.randrange(len(categories))] = "ranked"
     
     # 20% chance for a challenge quest (special objectives)
-    if rng.random() < 0.20:
-        replace_idx = int(rng.random() * len(categories))
-        categories[replace_idx] = "challenge"
+    if not rng.randrange(5):
+        categories[rng.randrange(len(categories))] = "challenge"
     
-    # Quest definitions with tier scaling
-    def scale_target(base: int) -> int:
-        return max(1, int(base * tier_mult))
-    
-    def scale_reward(base: int) -> int:
-        return max(10, int(base * reward_mult))
-
-    # Helper to generate description with actual target value
-    def desc_games(n): return f"Play {n} multiplayer game{'s' if n != 1 else ''}"
-    def desc_elims(n): return f"Get {n} elimination{'s' if n != 1 else ''}"
-    def desc_wins(n): return f"Win {n} multiplayer game{'s' if n != 1 else ''}"
-    
-    # Pre-calculate scaled targets for descriptions
-    engagement_targets = [scale_target(2), scale_target(3), scale_target(4)]
-    combat_targets = [scale_target(2), scale_target(4), scale_target(6)]
-    victory_targets = [1, scale_target(2)]
-    
-    defs = {
-        "engagement": [
-            ("mp_games", engagement_targets[0], scale_reward(35), "RUN OPERATIONS", desc_games(engagement_targets[0])),
-            ("mp_games", engagement_targets[1], scale_reward(55), "FIELD WORK", desc_games(engagement_targets[1])),
-            ("mp_games", engagement_targets[2], scale_reward(75), "FULL SHIFT", desc_games(engagement_targets[2])),
-        ],
-        "combat": [
-            ("mp_elims", combat_targets[0], scale_reward(45), "TARGET PRACTICE", desc_elims(combat_targets[0])),
-            ("mp_elims", combat_targets[1], scale_reward(70), "HUNTER MODE", desc_elims(combat_targets[1])),
-            ("mp_elims", combat_targets[2], scale_reward(95), "EXECUTION ORDER", desc_elims(combat_targets[2])),
-        ],
-        "victory": [
-            ("mp_wins", victory_targets[0], scale_reward(85), "SECURE THE WIN", desc_wins(victory_targets[0])),
-            ("mp_wins", victory_targets[1], scale_reward(140), "DOMINATE", desc_wins(victory_targets[1])),
-        ],
-        "ranked": [
-            ("ranked_games", 1, scale_reward(90), "RANKED DEPLOYMENT", "Play 1 ranked game"),
-            ("ranked_wins", 1, scale_reward(160), "RANKED VICTORY", "Win 1 ranked game"),
-        ],
-        "challenge": [
-            ("mp_elims_single", 2, scale_reward(120), "DOUBLE KILL", "Get 2+ eliminations in one game"),
-            ("mp_elims_single", 3, scale_reward(200), "TRIPLE THREAT", "Get 3+ eliminations in one game"),
-            ("mp_first_elim", 1, scale_reward(80), "FIRST BLOOD", "Get the first elimination in a game"),
-            ("mp_flawless", 1, scale_reward(250), "FLAWLESS", "Win without being eliminated"),
-        ],
-    }
-
     quests = []
     for cat in categories:
-        options = defs.get(cat) or []
+        options = catalog.get(cat)
         if not options:
             continue
         metric, target, reward, title, desc = rng.choice(options)
-        quests.append(_build_daily_quest(date_str, cat, metric, target, reward, title, desc, "daily"))
+        quests.append(_build_daily_quest_fast(date_str, cat, metric, target, reward, title, desc, "daily"))
 
-    # Guarantee stable ordering
-    quests.sort(key=lambda q: (q.get('category', ''), q.get('metric', ''), int(q.get('target', 0) or 0)))
+    # Guarantee stable ordering (each category appears at most once, so it alone is the key)
+    quests.sort(key=itemgetter('category'))
     return quests
 
 
+@lru_cache(maxsize=8)
+def _weekly_quest_catalog(tier: str, ranked_eligible: bool) -> tuple:
+    """Weekly quest options for a tier: (metric, target, reward, title, description)."""
+    reward_mult = _QUEST_TIER_MULTS[tier][1]
+
+    def scale_reward(base: int) -> int:
+        return max(50, int(base * reward_mult))
+
+    # Weekly quest definitions (higher targets, much higher rewards)
+    weekly_options = [
+        ("mp_games", 10, scale_reward(300), "WEEKLY OPS", "Play 10 games this week"),
+        ("mp_games", 15, scale_reward(500), "DEDICATED AGENT", "Play 15 games this week"),
+        ("mp_wins", 5, scale_reward(400), "WEEKLY CHAMPION", "Win 5 games this week"),
+        ("mp_wins", 8, scale_reward(650), "WEEKLY DOMINATOR", "Win 8 games this week"),
+        ("mp_elims", 15, scale_reward(350), "WEEKLY HUNTER", "Get 15 eliminations this week"),
+        ("mp_elims", 25, scale_reward(550), "WEEKLY EXECUTIONER", "Get 25 eliminations this week"),
+    ]
+    if ranked_eligible:
+        weekly_options.extend([
+            ("ranked_games", 5, scale_reward(450), "RANKED WEEK", "Play 5 ranked games this week"),
+            ("ranked_wins", 3, scale_reward(600), "RANKED DOMINATION", "Win 3 ranked games this week"),
+        ])
+    return tuple(weekly_options)
+
+
 def generate_weekly_quests_for_user(user: dict, week_start: str) -> list:
     """
     Generate weekly quests for a user. These persist for 7 days and have higher rewards.
@@ -3934,44 +4726,24 @@ def generate_weekly_quests_for_user(user: dict, week_start: str) -> list:
     except Exception:
         total_games = 0
     
-    # Tier multiplier
+    # Tier (reward multiplier only) and ranked eligibility select the catalog
     if total_games <= 10:
-        reward_mult = 0.8
+        tier = "new"
     elif total_games <= 50:
-        reward_mult = 1.0
+        tier = "mid"
     else:
-        reward_mult = 1.25
-    
-    def scale_reward(base: int) -> int:
-        return max(50, int(base * reward_mult))
-    
-    # Weekly quest definitions (higher targets, much higher rewards)
-    weekly_options = [
-        ("mp_games", 10, scale_reward(300), "WEEKLY OPS", "Play 10 games this week"),
-        ("mp_games", 15, scale_reward(500), "DEDICATED AGENT", "Play 15 games this week"),
-        ("mp_wins", 5, scale_reward(400), "WEEKLY CHAMPION", "Win 5 games this week"),
-        ("mp_wins", 8, scale_reward(650), "WEEKLY DOMINATOR", "Win 8 games this week"),
-        ("mp_elims", 15, scale_reward(350), "WEEKLY HUNTER", "Get 15 eliminations this week"),
-        ("mp_elims", 25, scale_reward(550), "WEEKLY EXECUTIONER", "Get 25 eliminations this week"),
-    ]
-    
-    # Check if user plays ranked
+        tier = "veteran"
     try:
         ranked_games = int(stats.get('ranked_games', 0) or 0)
     except Exception:
         ranked_games = 0
-    
-    if ranked_games > 0:
-        weekly_options.extend([
-            ("ranked_games", 5, scale_reward(450), "RANKED WEEK", "Play 5 ranked games this week"),
-            ("ranked_wins", 3, scale_reward(600), "RANKED DOMINATION", "Win 3 ranked games this week"),
-        ])
+    weekly_options = _weekly_quest_catalog(tier, ranked_games > 0)
     
     # Pick 2 weekly quests
     quests = []
     chosen = rng.sample(weekly_options, min(2, len(weekly_options)))
     for metric, target, reward, title, desc in chosen:
-        quests.append(_build_daily_quest(week_start, "weekly", metric, target, reward, title, desc, "weekly"))
+        quests.append(_build_daily_quest_fast(week_start, "weekly", metric, target, reward, title, desc, "weekly"))
     
     return quests
 
@@ -4023,9 +4795,14 @@ def _is_valid_daily_quests_state(state: dict) -> bool:
 
 def ensure_daily_quests_today(user: dict, persist: bool = True) -> dict:
     """Ensure the user has a daily quest set for today (UTC), generating if needed."""
-    ensure_user_economy(user, persist=False)
+    daily = ensure_user_economy(user, persist=False)['daily_quests']
     today = utc_today_str()
-    state = _normalize_daily_quests_state((user or {}).get('daily_quests'))
+    # Steady state: today's set is already stored in canonical shape
+    if daily.get('date') == today:
+        quests = daily['quests']
+        if quests and isinstance(quests[0], dict) and quests[0].get('id') and quests[0].get('metric'):
+            return daily
+    state = _normalize_daily_quests_state(daily)
 
     if state.get('date') != today or not _is_valid_daily_quests_state(state):
         state = {"date": today, "quests": generate_daily_quests_for_user(user, today)}
@@ -4036,115 +4813,99 @@ def ensure_daily_quests_today(user: dict, persist: bool = True) -> dict:
     return state
 
 
-def apply_daily_quest_progress(user: dict, deltas: dict, persist: bool = True) -> dict:
+def _quest_progress_increments(deltas: dict) -> dict:
+    """Normalize progress deltas to {metric: positive int increment}."""
+    incs = {}
+    for metric, raw in deltas.items():
+        if not metric:
+            continue
+        try:
+            inc = int(raw or 0)
+        except Exception:
+            inc = 0
+        if inc > 0:
+            incs[metric] = inc
+    return incs
+
+
+def _apply_quest_increments(quests: list, incs: dict) -> bool:
     """
-    Apply per-metric progress deltas to the user's daily quests (today only).
-    Deltas example: {\"mp_games\": 1, \"mp_elims\": 2}
+    Add per-metric increments (from _quest_progress_increments) to matching
+    quests' progress, capped at target.
+    
+    Quests built by _build_daily_quest already store int progress/target, so
+    only legacy/malformed quests pay for the defensive conversions. Returns
+    True if any quest changed.
     """
-    if not isinstance(user, dict):
-        return new_daily_quests_state()
-    if not isinstance(deltas, dict) or not deltas:
-        return ensure_daily_quests_today(user, persist=persist)
-
-    state = ensure_daily_quests_today(user, persist=False)
-    quests = state.get('quests', [])
-    if not isinstance(quests, list):
-        quests = []
+    if not incs:
+        return False
 
     changed = False
+    # A user holds a handful of quests, so one straight pass beats indexing by metric
     for q in quests:
         if not isinstance(q, dict):
             continue
-        metric = q.get('metric')
-        if not metric or metric not in deltas:
+        inc = incs.get(q.get('metric'))
+        if not inc:
             continue
-        try:
-            inc = int(deltas.get(metric, 0) or 0)
-        except Exception:
-            inc = 0
-        if inc <= 0:
-            continue
-        try:
-            progress = int(q.get('progress', 0) or 0)
-        except Exception:
-            progress = 0
-        try:
-            target = int(q.get('target', 0) or 0)
-        except Exception:
-            target = 0
+        progress = q.get('progress', 0)
+        target = q.get('target', 0)
+        if type(progress) is not int or type(target) is not int:
+            try:
+                progress = int(progress or 0)
+            except Exception:
+                progress = 0
+            try:
+                target = int(target or 0)
+            except Exception:
+                target = 0
         if target <= 0:
             continue
         new_progress = progress + inc
         if new_progress > target:
             new_progress = target
         if new_progress != progress:
-            q['progress'] = int(new_progress)
+            q['progress'] = new_progress
             changed = True
-
-    if changed:
-        user['daily_quests'] = state
-        if persist:
-            save_user(user)
-
-    return state
+    return changed
 
 
-def apply_weekly_quest_progress(user: dict, deltas: dict, persist: bool = True) -> list:
+def apply_quest_progress(user: dict, deltas: dict, persist: bool = True):
     """
-    Apply per-metric progress deltas to the user's weekly quests.
-    Deltas example: {\"mp_games\": 1, \"mp_elims\": 2}
+    Apply per-metric progress deltas to the user's daily and weekly quests
+    together, saving the user at most once.
+    
+    Returns (daily_state, weekly_quests).
     """
     if not isinstance(user, dict):
-        return []
-    if not isinstance(deltas, dict) or not deltas:
-        return ensure_weekly_quests(user, persist=persist)
+        return new_daily_quests_state(), []
 
-    quests = ensure_weekly_quests(user, persist=False)
-    if not isinstance(quests, list):
-        quests = []
-
-    changed = False
-    for q in quests:
-        if not isinstance(q, dict):
-            continue
-        metric = q.get('metric')
-        if not metric or metric not in deltas:
-            continue
-        try:
-            inc = int(deltas.get(metric, 0) or 0)
-        except Exception:
-            inc = 0
-        if inc <= 0:
-            continue
-        try:
-            progress = int(q.get('progress', 0) or 0)
-        except Exception:
-            progress = 0
-        try:
-            target = int(q.get('target', 0) or 0)
-        except Exception:
-            target = 0
-        if target <= 0:
-            continue
-        new_progress = progress + inc
-        if new_progress > target:
-            new_progress = target
-        if new_progress != progress:
-            q['progress'] = int(new_progress)
+    daily_before = user.get('daily_quests')
+    weekly_before = user.get('weekly_quests')
+    state = ensure_daily_quests_today(user, persist=False)
+    weekly_quests = ensure_weekly_quests(user, persist=False)
+    # A fresh quest set was generated for today / this week
+    changed = user.get('daily_quests') is not daily_before or user.get('weekly_quests') is not weekly_before
+
+    incs = _quest_progress_increments(deltas) if isinstance(deltas, dict) else {}
+    if incs:
+        daily_quests = state.get('quests', [])
+        if _apply_quest_increments(daily_quests if isinstance(daily_quests, list) else [], incs):
+            user['daily_quests'] = state
+            changed = True
+        if isinstance(weekly_quests, list) and _apply_quest_increments(weekly_quests, incs):
+            user['weekly_quests'] = {"week_start": get_week_start_str(), "quests": weekly_quests}
             changed = True
 
-    if changed:
-        week_start = get_week_start_str()
-        user['weekly_quests'] = {"week_start": week_start, "quests": quests}
-        if persist:
-            save_user(user)
+    if changed and persist:
+        save_user(user)
 
-    return quests
+    return state, weekly_quests
 
 
 def get_visible_cosmetics(user: dict) -> dict:
     """Get only the cosmetics that are visible to other players."""
-    cosmetics = get_user_cosmetics(user)
+    cosmetics = get_user_cosmetics(user, persist_changes=False)
     return {
         "card_border": cosmetics.get("card_border", "classic"),
         "name_color": cosmetics.get("name_color", "default"),
@@ -4256,8 +5017,6 @@ def build_word_change_options(player: dict, game: dict) -> list:
     Sample size is halved for 50-word games.
     Excludes current secret words of OTHER players AND previously guessed words.
     """
-    import random
-    
     # Get full theme words
     all_theme_words = (game.get('theme', {}) or {}).get('words', [])
     
@@ -4268,21 +5027,18 @@ def build_word_change_options(player: dict, game: dict) -> list:
     
     # Get current secret words of OTHER players
     player_id = player.get('id')
-    current_secrets = set()
-    for p in game.get('players', []):
-        if p.get('id') != player_id and p.get('secret_word'):
-            current_secrets.add(p['secret_word'].lower())
+    current_secrets = {
+        p['secret_word'].lower() for p in game.get('players', ())
+        if p.get('id') != player_id and p.get('secret_word')
+    }
     
     # Get all previously guessed words from history
-    guessed_words = set()
-    for entry in game.get('history', []):
-        word = entry.get('word', '').lower()
-        if word:
-            guessed_words.add(word)
+    guessed_words = _history_word_index(game).all_guessed
     
     # Filter to exclude current secrets of other players AND guessed words
-    available = [w for w in all_theme_words 
-                 if w.lower() not in current_secrets and w.lower() not in guessed_words]
+    excluded = current_secrets | guessed_words
+    # One pass, one list (no separate keep-mask)
+    available = [w for w, wl in zip(all_theme_words, _theme_words_lower(game)) if wl not in excluded]
     
     if not available:
         # Fallback: allow keeping current word
@@ -4299,27 +5055,111 @@ def build_word_change_options(player: dict, game: dict) -> list:
     return sorted(random.sample(available, sample_size))
 
 
-def get_embedding(word: str, game: dict = None) -> list:
-    """Get embedding for a word from Redis cache (game parameter kept for API compatibility)."""
+# Format tag on cached embeddings, so the dtype/layout can change without
+# misreading older entries (':' never occurs in base64 or JSON lists)
+EMBEDDING_CACHE_FORMAT = 'f16:'
+
+
+def _encode_embedding(embedding) -> str:
+    """
+    Pack an embedding for the Redis cache as tagged base64 float16 bytes.
+    
+    About 4KB per 1536-dim vector instead of ~30KB of JSON. Vectors are
+    unit-normalized before packing; values are cast back to float32 on read,
+    before any dot products. (Base64 because the Upstash REST client only
+    carries text values.)
+    """
+    return EMBEDDING_CACHE_FORMAT + base64.b64encode(_unit_vector(embedding).astype(np.float16).tobytes()).decode('ascii')
+
+
+def _decode_embedding(cached) -> np.ndarray:
+    """
+    Unpack a cached embedding (tagged or untagged float16 payload, or a
+    legacy JSON list).
+    
+    Always returns a unit-length float32 vector (renormalized after float16 rounding,
+    and for legacy entries written before normalization), so cosine
+    similarity between cached embeddings is a plain dot product.
+    """
+    if isinstance(cached, bytes):
+        cached = cached.decode('ascii')
+    if cached.startswith('['):
+        return _unit_vector(_json_loads(cached))
+    if cached.startswith(EMBEDDING_CACHE_FORMAT):
+        cached = cached[len(EMBEDDING_CACHE_FORMAT):]
+    return _unit_vector(np.frombuffer(base64.b64decode(cached), dtype=np.float16))
+
+
+# word -> float32 embedding, in front of Redis. Embeddings for a word never
+# change, so entries stay valid for the life of the process; oldest entries are
+# evicted first.
+_embedding_l1 = {}
+
+
+def _remember_embedding(word_lower: str, embedding) -> np.ndarray:
+    """Store an embedding in the process-local cache (as a read-only float32 array) and return it."""
+    embedding = np.asarray(embedding, dtype=np.float32)
+    embedding.flags.writeable = False  # Shared across requests
+    if word_lower not in _embedding_l1 and len(_embedding_l1) >= EMBEDDING_L1_MAX_WORDS:
+        del _embedding_l1[next(iter(_embedding_l1))]
+    _embedding_l1[word_lower] = embedding
+    return embedding
+
+
+def get_embedding(word: str, game: dict = None) -> np.ndarray:
+    """Get the unit-normalized embedding for a word from Redis cache (game parameter kept for API compatibility).
+    
+    Results are also kept in a process-local cache as float32 arrays; treat
+    the returned array as read-only.
+    """
     word_lower = word.lower().strip()
+    cached = _embedding_l1.get(word_lower)
+    if cached is not None:
+        return cached
     
     # Check Redis cache
     redis = get_redis()
     cache_key = f"emb:{word_lower}"
     cached = redis.get(cache_key)
     if cached:
-        return json.loads(cached)
+        return _remember_embedding(word_lower, _decode_embedding(cached))
     
     client = get_openai_client()
     response = client.embeddings.create(
         model=EMBEDDING_MODEL,
         input=word_lower,
     )
-    embedding = response.data[0].embedding
+    embedding = _unit_vector(response.data[0].embedding)
     
     # Cache embedding
-    redis.setex(cache_key, EMBEDDING_CACHE_SECONDS, json.dumps(embedding))
-    return embedding
+    redis.setex(cache_key, EMBEDDING_CACHE_SECONDS, _encode_embedding(embedding))
+    return _remember_embedding(word_lower, embedding)
+
+
+def _prewarm_embeddings(words: list):
+    """Load a word pool's embeddings in one batch so later get_embedding calls hit the local cache."""
+    try:
+        batch_get_embeddings(words)
+    except Exception as e:
+        print(f"Embedding prewarm error: {e}")
+
+
+def _embedding_batches(words: list) -> list:
+    """Split words into embeddings.create batches, capped by input count and estimated tokens."""
+    batches = []
+    batch = []
+    tokens = 0
+    for word in words:
+        est = len(word) // 3 + 1  # ~3 characters per token, rounded up
+        if batch and (len(batch) >= EMBEDDING_BATCH_SIZE or tokens + est > EMBEDDING_BATCH_TOKEN_BUDGET):
+            batches.append(batch)
+            batch = []
+            tokens = 0
+        batch.append(word)
+        tokens += est
+    if batch:
+        batches.append(batch)
+    return batches
 
 
 def batch_get_embeddings(words: list, max_retries: int = 2) -> dict:
@@ -4327,7 +5167,9 @@ def batch_get_embeddings(words: list, max_retries: int = 2) -> dict:
     Get embeddings for multiple words efficiently using batch API.
     Returns dict mapping lowercase words to their embeddings.
     
-    Uses Redis mget for batch cache lookups (1 HTTP call instead of N).
+    Uses Redis mget for batch cache lookups (1 HTTP call instead of N); words
+    already in the process-local cache skip Redis entirely, and everything
+    fetched is added to it.
     """
     result = {}
     redis = get_redis()
@@ -4338,8 +5180,12 @@ def batch_get_embeddings(words: list, max_retries: int = 2) -> dict:
     for word in words:
         word_lower = word.lower().strip()
         if word_lower and word_lower not in seen:
-            normalized_words.append(word_lower)
             seen.add(word_lower)
+            cached = _embedding_l1.get(word_lower)
+            if cached is not None:
+                result[word_lower] = cached
+            else:
+                normalized_words.append(word_lower)
     
     if not normalized_words:
         return result
@@ -4354,7 +5200,7 @@ def batch_get_embeddings(words: list, max_retries: int = 2) -> dict:
             word = normalized_words[i]
             if cached:
                 try:
-                    result[word] = json.loads(cached)
+                    result[word] = _remember_embedding(word, _decode_embedding(cached))
                 except Exception:
                     to_fetch.append(word)
             else:
@@ -4367,24 +5213,35 @@ def batch_get_embeddings(words: list, max_retries: int = 2) -> dict:
     if to_fetch:
         retries = 0
         while to_fetch and retries <= max_retries:
+            to_cache = {}  # Collect for batch cache write
             try:
                 client = get_openai_client()
-                # OpenAI batch limit is typically 2048 inputs, but chunk for safety
-                batch_size = 100
-                to_cache = {}  # Collect for batch cache write
+                batches = _embedding_batches(to_fetch)
+                batch_error = None
                 
-                for i in range(0, len(to_fetch), batch_size):
-                    batch = to_fetch[i:i + batch_size]
-                    response = client.embeddings.create(
-                        model=EMBEDDING_MODEL,
-                        input=batch,
-                    )
-                    
-                    for j, embedding_data in enumerate(response.data):
-                        word = batch[j]
-                        embedding = embedding_data.embedding
-                        result[word] = embedding
-                        to_cache[f"emb:{word}"] = json.dumps(embedding)
+                # Batches are independent, so overlap their round-trips; results are
+                # handled on this thread as each one completes
+                with ThreadPoolExecutor(max_workers=min(EMBEDDING_FETCH_CONCURRENCY, len(batches))) as pool:
+                    futures = {
+                        pool.submit(client.embeddings.create, model=EMBEDDING_MODEL, input=batch): batch
+                        for batch in batches
+                    }
+                    for future in as_completed(futures):
+                        batch = futures[future]
+                        try:
+                            response = future.result()
+                        except Exception as e:
+                            batch_error = e
+                            continue
+                        for j, embedding_data in enumerate(response.data):
+                            word = batch[j]
+                            embedding = _unit_vector(embedding_data.embedding)
+                            result[word] = _remember_embedding(word, embedding)
+                            to_cache[f"emb:{word}"] = _encode_embedding(embedding)
+                
+                # A failed batch is retried below; the others are kept
+                if batch_error is not None:
+                    raise batch_error
                 
                 # Batch cache write using mset (1 HTTP call)
                 if to_cache:
@@ -4400,9 +5257,15 @@ def batch_get_embeddings(words: list, max_retries: int = 2) -> dict:
                     
             except Exception as e:
                 print(f"Batch embedding error (attempt {retries + 1}): {e}")
+                # Keep the chunks that did succeed: cache them and don't re-request them
+                if to_cache:
+                    try:
+                        redis.mset(to_cache)
+                    except Exception:
+                        pass
+                to_fetch = [w for w in to_fetch if w not in result]
                 retries += 1
                 if retries <= max_retries:
-                    import time
                     time.sleep(0.5 * retries)  # Exponential backoff
         
         # Log if some words still missing after retries
@@ -4417,27 +5280,47 @@ def get_theme_embeddings(game: dict) -> dict:
     Get all theme word embeddings from Redis cache.
     Returns dict mapping lowercase words to their embeddings.
     
-    Embeddings are cached in Redis during game start, so this is fast.
+    Embeddings are cached in Redis during game start, so this is fast: words
+    in the process-local cache skip Redis, the rest are read with one mget.
+    A complete result is cached on game['_theme_embeddings'] for the request
+    (stripped by save_game); treat it as read-only.
     """
     theme_words = game.get('theme', {}).get('words', [])
     if not theme_words:
         return {}
+    cached = game.get('_theme_embeddings')
+    if cached is not None and cached[0] is theme_words:
+        return cached[1]
     
-    result = {}
-    redis = get_redis()
-    
+    # Theme order is kept; None marks words still to be read from Redis
+    found = {}
+    missing = []
     for word in theme_words:
         word_lower = word.lower().strip()
-        if not word_lower:
+        if not word_lower or word_lower in found:
             continue
-        cache_key = f"emb:{word_lower}"
+        cached = _embedding_l1.get(word_lower)
+        found[word_lower] = cached
+        if cached is None:
+            missing.append(word_lower)
+    
+    if missing:
         try:
-            cached = redis.get(cache_key)
-            if cached:
-                result[word_lower] = json.loads(cached)
+            cached_values = get_redis().mget(*[f"emb:{w}" for w in missing])
         except Exception:
-            pass
+            cached_values = ()
+        for word_lower, cached in zip(missing, cached_values):
+            if not cached:
+                continue
+            try:
+                found[word_lower] = _remember_embedding(word_lower, _decode_embedding(cached))
+            except Exception:
+                pass
     
+    result = {w: emb for w, emb in found.items() if emb is not None}
+    # Only a complete set is reused; missing words may be embedded meanwhile
+    if len(result) == len(found):
+        game['_theme_embeddings'] = (theme_words, result)
     return result
 
 
@@ -4474,30 +5357,26 @@ def precompute_theme_similarities(game: dict, theme_embeddings: dict) -> dict:
     """
     Pre-compute similarity matrix for all theme words using vectorized numpy operations.
     Returns dict mapping word -> {word: similarity} for O(1) lookups.
+    
+    Embeddings must be unit length (as returned by get_embedding /
+    batch_get_embeddings), so cosine similarity is a plain dot product.
     """
-    words = list(theme_embeddings.keys())
+    words = tuple(theme_embeddings)
     if not words:
         return {}
     
     # Stack all embeddings into a matrix for vectorized computation
-    embeddings_matrix = np.array([theme_embeddings[w] for w in words])
-    
-    # Normalize all vectors (for cosine similarity)
-    norms = np.linalg.norm(embeddings_matrix, axis=1, keepdims=True)
-    norms[norms == 0] = 1  # Avoid division by zero
-    normalized = embeddings_matrix / norms
+    # float32 is all the precision the (float16-cached) embeddings carry, and runs as sgemm
+    embeddings_matrix = np.array(list(theme_embeddings.values()), dtype=np.float32)
     
     # Compute all pairwise similarities at once: (n x d) @ (d x n) = (n x n)
-    similarity_matrix = np.dot(normalized, normalized.T)
-    
-    # Convert to dict format
-    matrix = {}
-    for i, w1 in enumerate(words):
-        matrix[w1] = {}
-        for j, w2 in enumerate(words):
-            matrix[w1][w2] = round(float(similarity_matrix[i, j]), 4)
+    similarity_matrix = embeddings_matrix @ embeddings_matrix.T
+    np.clip(similarity_matrix, -1.0, 1.0, out=similarity_matrix)
     
-    return matrix
+    # Convert to dict format (round + float conversion in one C-level pass);
+    # round in float64 so values come out as clean 4-decimal floats
+    rounded = np.round(similarity_matrix.astype(np.float64), 4).tolist()
+    return {w1: dict(zip(words, row)) for w1, row in zip(words, rounded)}
 
 
 def cosine_similarity(embedding1, embedding2) -> float:
@@ -4513,16 +5392,39 @@ def cosine_similarity(embedding1, embedding2) -> float:
 
 # ============== GAME STORAGE ==============
 
+def _strip_runtime_keys(data: dict) -> dict:
+    """Copy of data without runtime-only keys (starting with '_'), or data itself if none."""
+    if not any(k.startswith('_') for k in data):
+        return data
+    return {k: v for k, v in data.items() if not k.startswith('_')}
+
+
+def _persistable_game(game_data: dict) -> dict:
+    """Drop runtime-only caches (keys starting with '_') before serializing.
+    
+    Covers the game dict itself and each player dict (e.g. AI '_resolved').
+    """
+    persisted = _strip_runtime_keys(game_data)
+    players = game_data.get('players')
+    if isinstance(players, list):
+        stripped = [_strip_runtime_keys(p) if isinstance(p, dict) else p for p in players]
+        if any(a is not b for a, b in zip(stripped, players)):
+            if persisted is game_data:
+                persisted = dict(game_data)
+            persisted['players'] = stripped
+    return persisted
+
+
 def save_game(code: str, game_data: dict):
     redis = get_redis()
-    redis.setex(f"game:{code}", GAME_EXPIRY_SECONDS, json.dumps(game_data))
+    redis.setex(f"game:{code}", GAME_EXPIRY_SECONDS, _json_dumps(_persistable_game(game_data)))
 
 
 def load_game(code: str) -> Optional[dict]:
     redis = get_redis()
     data = redis.get(f"game:{code}")
     if data:
-        return json.loads(data)
+        return _json_loads(data)
     return None
 
 
@@ -4544,11 +5446,12 @@ def touch_presence(code: str, kind: str, member: str):
             return
         now = float(time.time())
         cutoff = now - float(PRESENCE_TTL_SECONDS)
-        redis = get_redis()
         key = _presence_key(code, kind)
-        redis.zadd(key, {member: now})
-        # Best-effort prune of old entries
-        redis.zremrangebyscore(key, 0, cutoff)
+        # Heartbeat + best-effort prune of old entries in one round-trip
+        pipe = get_redis().pipeline()
+        pipe.zadd(key, {member: now})
+        pipe.zremrangebyscore(key, 0, cutoff)
+        pipe.exec()
     except Exception:
         # Presence is best-effort; never fail the request
         return
@@ -4559,11 +5462,12 @@ def get_spectator_count(code: str) -> int:
     try:
         now = float(time.time())
         cutoff = now - float(PRESENCE_TTL_SECONDS)
-        redis = get_redis()
-        # Prune both sets so they don't grow unbounded
-        redis.zremrangebyscore(_presence_key(code, "players"), 0, cutoff)
-        redis.zremrangebyscore(_presence_key(code, "spectators"), 0, cutoff)
-        val = redis.zcard(_presence_key(code, "spectators"))
+        # Prune both sets so they don't grow unbounded, then count (one round-trip)
+        pipe = get_redis().pipeline()
+        pipe.zremrangebyscore(_presence_key(code, "players"), 0, cutoff)
+        pipe.zremrangebyscore(_presence_key(code, "spectators"), 0, cutoff)
+        pipe.zcard(_presence_key(code, "spectators"))
+        val = pipe.exec()[-1]
         try:
             return int(val or 0)
         except Exception:
@@ -4574,13 +5478,10 @@ def get_spectator_count(code: str) -> int:
 
 # ============== PLAYER STATS ==============
 
-def get_player_stats(name: str) -> dict:
-    """Get stats for a player by name."""
-    redis = get_redis()
-    key = f"stats:{name.lower()}"
-    data = redis.get(key)
+def _parse_player_stats(name: str, data) -> dict:
+    """Decode a stats:{name} payload, or default stats if there is none."""
     if data:
-        stats = json.loads(data)
+        stats = _json_loads(data)
         # Ensure all new fields exist for backwards compatibility
         stats.setdefault('eliminations', 0)
         stats.setdefault('times_eliminated', 0)
@@ -4600,18 +5501,42 @@ def get_player_stats(name: str) -> dict:
     }
 
 
-def save_player_stats(name: str, stats: dict):
-    """Save player stats."""
+def get_player_stats(name: str) -> dict:
+    """Get stats for a player by name."""
     redis = get_redis()
     key = f"stats:{name.lower()}"
+    return _parse_player_stats(name, redis.get(key))
+
+
+# Keys per mget when loading stats for a whole leaderboard
+PLAYER_STATS_MGET_CHUNK = 500
+
+
+def get_player_stats_bulk(names) -> list:
+    """Get stats for many players (in the given order) with one mget per chunk."""
+    names = list(names)
+    redis = get_redis()
+    result = []
+    for start in range(0, len(names), PLAYER_STATS_MGET_CHUNK):
+        chunk = names[start:start + PLAYER_STATS_MGET_CHUNK]
+        values = redis.mget(*[f"stats:{n.lower()}" for n in chunk])
+        result.extend(_parse_player_stats(n, data) for n, data in zip(chunk, values))
+    return result
+
+
+def save_player_stats(name: str, stats: dict):
+    """Save player stats."""
+    name_lower = name.lower()
+    week_key = get_weekly_leaderboard_key()
+    # All three writes go out in one pipelined request
+    pipe = get_redis().pipeline()
     # Stats never expire
-    redis.set(key, json.dumps(stats))
+    pipe.set(f"stats:{name_lower}", _json_dumps(stats))
     # Also add to leaderboard set
-    redis.sadd("leaderboard:players", name.lower())
-    
+    pipe.sadd("leaderboard:players", name_lower)
     # Update weekly leaderboard (sorted sets)
-    week_key = get_weekly_leaderboard_key()
-    redis.zadd(f"leaderboard:weekly:{week_key}", {name.lower(): stats.get('wins', 0)})
+    pipe.zadd(f"leaderboard:weekly:{week_key}", {name_lower: stats.get('wins', 0)})
+    pipe.exec()
 
 
 def get_weekly_leaderboard_key() -> str:
@@ -4647,6 +5572,20 @@ def _ranked_elimination_index(game: dict) -> dict:
     return elim_at
 
 
+def _elo_pairwise_deltas(ratings: np.ndarray, rank_vals: np.ndarray) -> np.ndarray:
+    """
+    Sum over opponents of (actual - expected) Elo score for each player.
+    
+    Higher rank value beats lower (equal is a tie, scored 0.5 each).
+    """
+    # expected[i, j] = Elo expected score of i vs j, score[i, j] = 1 / 0.5 / 0 for win / tie / loss
+    expected = 1.0 / (1.0 + np.power(10.0, (ratings[None, :] - ratings[:, None]) / 400.0))
+    score = (np.sign(rank_vals[:, None] - rank_vals[None, :]) + 1.0) * 0.5
+    outcome = score - expected
+    np.fill_diagonal(outcome, 0.0)
+    return outcome.sum(axis=1)
+
+
 def apply_ranked_mmr_updates(game: dict):
     """
     Apply multi-player Elo/MMR updates for ranked games (Google-auth only).
@@ -4674,12 +5613,21 @@ def apply_ranked_mmr_updates(game: dict):
                 return
             if isinstance(raw, bytes):
                 raw = raw.decode()
-            data = json.loads(raw)
+            data = _json_loads(raw)
             if isinstance(data, dict):
                 game['ranked_mmr'] = data
         except Exception:
             return
 
+    def _update_mmr_leaderboard(mmr_by_uid: dict):
+        """Write all players' leaderboard:mmr scores in one zadd."""
+        if not mmr_by_uid:
+            return
+        try:
+            redis.zadd("leaderboard:mmr", mmr_by_uid)
+        except Exception as e:
+            print(f"Failed to update ranked leaderboard for {list(mmr_by_uid)}: {e}")
+
     # If already processed, still try to attach saved results (for robustness against concurrent saves)
     if game.get('ranked_processed'):
         print(f"[RANKED DEBUG] Game {code} already processed (ranked_processed=True)")
@@ -4731,6 +5679,7 @@ def apply_ranked_mmr_updates(game: dict):
         # still increment ranked_games for the solo human participant
         # so placement progress (0/5) is tracked correctly.
         print(f"[RANKED DEBUG] Game {code} has < 2 participants, updating stats without MMR calc")
+        mmr_by_uid = {}
         for p in participants:
             uid = p.get('auth_user_id')
             if not uid:
@@ -4750,10 +5699,10 @@ def apply_ranked_mmr_updates(game: dict):
             
             # Also update leaderboard zset so player appears after placement
             try:
-                current_mmr = int(u_stats.get('mmr', RANKED_INITIAL_MMR) or RANKED_INITIAL_MMR)
-                redis.zadd("leaderboard:mmr", {uid: current_mmr})
+                mmr_by_uid[uid] = int(u_stats.get('mmr', RANKED_INITIAL_MMR) or RANKED_INITIAL_MMR)
             except Exception as e:
                 print(f"Failed to update ranked leaderboard for {uid}: {e}")
+        _update_mmr_leaderboard(mmr_by_uid)
         game['ranked_processed'] = True
         return
 
@@ -4795,6 +5744,7 @@ def apply_ranked_mmr_updates(game: dict):
     if len(rating) < 2:
         print(f"[RANKED DEBUG] Game {code} couldn't load 2+ users (loaded {len(rating)}), updating stats without MMR calc")
         # Update ranked_games for any users we did load
+        mmr_by_uid = {}
         for uid, user in user_map.items():
             u_stats = get_user_stats(user)
             u_stats['ranked_games'] = int(u_stats.get('ranked_games', 0) or 0) + 1
@@ -4813,10 +5763,10 @@ def apply_ranked_mmr_updates(game: dict):
             
             # Also update leaderboard zset so player appears after placement
             try:
-                current_mmr = int(u_stats.get('mmr', RANKED_INITIAL_MMR) or RANKED_INITIAL_MMR)
-                redis.zadd("leaderboard:mmr", {uid: current_mmr})
+                mmr_by_uid[uid] = int(u_stats.get('mmr', RANKED_INITIAL_MMR) or RANKED_INITIAL_MMR)
             except Exception as e:
                 print(f"Failed to update ranked leaderboard for {uid}: {e}")
+        _update_mmr_leaderboard(mmr_by_uid)
         game['ranked_processed'] = True
         return
 
@@ -4831,40 +5781,16 @@ def apply_ranked_mmr_updates(game: dict):
     
     print(f"[RANKED DEBUG] Game {code} processing MMR for {n} players")
 
-    deltas = {uid: 0.0 for uid in uids}
-
-    def expected(ra: float, rb: float) -> float:
-        return 1.0 / (1.0 + (10.0 ** ((rb - ra) / 400.0)))
-
     # Pairwise accumulation
-    for i in range(n):
-        for j in range(i + 1, n):
-            ui = uids[i]
-            uj = uids[j]
-            pi = uid_to_pid[ui]
-            pj = uid_to_pid[uj]
-            ri = rating[ui]
-            rj = rating[uj]
-
-            ei = expected(ri, rj)
-            ej = 1.0 - ei
-
-            vi = rank_value.get(pi, 0)
-            vj = rank_value.get(pj, 0)
-            if vi > vj:
-                si, sj = 1.0, 0.0
-            elif vi < vj:
-                si, sj = 0.0, 1.0
-            else:
-                si, sj = 0.5, 0.5
-
-            deltas[ui] += (si - ei)
-            deltas[uj] += (sj - ej)
+    r = np.array([rating[uid] for uid in uids], dtype=np.float64)
+    v = np.array([rank_value.get(uid_to_pid[uid], 0) for uid in uids], dtype=np.float64)
+    deltas = dict(zip(uids, _elo_pairwise_deltas(r, v).tolist()))
 
     # Apply updates + persist
     # Also record per-game deltas so the frontend can show MMR change on the game-over screen.
     # Use per-player K-factor: higher for placement players (< RANKED_PLACEMENT_GAMES)
     mmr_result_by_pid = {}
+    mmr_by_uid = {}
     for uid in uids:
         user = user_map.get(uid)
         if not user:
@@ -4923,11 +5849,8 @@ def apply_ranked_mmr_updates(game: dict):
         save_user(user)
         print(f"[RANKED DEBUG] Updated user {uid}: ranked_games={u_stats.get('ranked_games')}, mmr={u_stats.get('mmr')}, delta={delta_int}")
 
-        # Update ranked leaderboard zset
-        try:
-            redis.zadd("leaderboard:mmr", {uid: new_int})
-        except Exception as e:
-            print(f"Failed to update ranked leaderboard for {uid}: {e}")
+        # Ranked leaderboard zset (written for all players after the loop)
+        mmr_by_uid[uid] = new_int
 
         pid = uid_to_pid.get(uid)
         if pid:
@@ -4938,16 +5861,18 @@ def apply_ranked_mmr_updates(game: dict):
                 "delta": int(delta_int),
             }
 
+    _update_mmr_leaderboard(mmr_by_uid)
+
     game['ranked_processed'] = True
     if mmr_result_by_pid:
         game['ranked_mmr'] = mmr_result_by_pid
         print(f"[RANKED DEBUG] Game {code} finished processing, mmr_result_by_pid={mmr_result_by_pid}")
         # Persist results in Redis so concurrent finish requests can attach them reliably.
         try:
-            redis.setex(result_key, GAME_EXPIRY_SECONDS, json.dumps(mmr_result_by_pid))
+            redis.setex(result_key, GAME_EXPIRY_SECONDS, _json_dumps(mmr_result_by_pid))
         except Exception:
             try:
-                redis.set(result_key, json.dumps(mmr_result_by_pid))
+                redis.set(result_key, _json_dumps(mmr_result_by_pid))
             except Exception:
                 pass
     else:
@@ -5063,8 +5988,7 @@ def update_game_stats(game: dict):
                         deltas["ranked_games"] = 1
                         if player['id'] == winner_id:
                             deltas["ranked_wins"] = 1
-                    apply_daily_quest_progress(auth_user, deltas, persist=False)
-                    apply_weekly_quest_progress(auth_user, deltas, persist=False)
+                    apply_quest_progress(auth_user, deltas, persist=False)
 
                     save_user(auth_user)
 
@@ -5095,8 +6019,8 @@ def get_leaderboard(leaderboard_type: str = 'alltime') -> list:
             return []
         
         players = []
-        for name, wins in weekly_data:
-            stats = get_player_stats(name)
+        all_stats = get_player_stats_bulk(name for name, _ in weekly_data)
+        for (name, wins), stats in zip(weekly_data, all_stats):
             if stats['games_played'] > 0:
                 stats['weekly_wins'] = int(wins)
                 stats['avg_closeness'] = (
@@ -5114,8 +6038,7 @@ def get_leaderboard(leaderboard_type: str = 'alltime') -> list:
         return []
     
     players = []
-    for name in player_names:
-        stats = get_player_stats(name)
+    for stats in get_player_stats_bulk(player_names):
         if stats['games_played'] > 0:
             stats['avg_closeness'] = (
                 stats['total_similarity'] / stats['total_guesses'] 
@@ -5680,8 +6603,6 @@ def _create_match_from_queue(redis, mode: str, players: list, ai_fill: int = 0)
         players: List of player data dicts
         ai_fill: Number of AI players to add (quick_play only)
     """
-    import random
-    
     try:
         # Generate game code
         code = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(6))
@@ -6452,11 +7373,13 @@ class handler(BaseHTTPRequestHandler):
             if not user:
                 return self._send_error("User not found", 404)
 
-            econ = ensure_user_economy(user, persist=True)
-            daily_state = ensure_daily_quests_today(user, persist=True)
-            weekly_quests = ensure_weekly_quests(user, persist=True)
-            # Check/update streak
-            streak_result = check_and_update_streak(user, persist=True)
+            # One user write for economy, quests and streak updates together
+            with UserWriteBatch():
+                econ = ensure_user_economy(user, persist=True)
+                daily_state = ensure_daily_quests_today(user, persist=True)
+                weekly_quests = ensure_weekly_quests(user, persist=True)
+                # Check/update streak
+                streak_result = check_and_update_streak(user, persist=True)
             streak_info = get_next_streak_info(streak_result['streak'].get('streak_count', 0))
 
             return self._send_json({
@@ -6824,8 +7747,6 @@ class handler(BaseHTTPRequestHandler):
             if not game:
                 return self._send_error("Game not found", 404)
             
-            import random
-            
             # Get all theme words and ALL words already in any player's pool
             all_theme_words = game.get('theme', {}).get('words', [])
             assigned_words = set()
@@ -6834,7 +7755,7 @@ class handler(BaseHTTPRequestHandler):
                 assigned_words.update(w.lower() for w in p.get('word_pool', []))
             
             # Available words = all words not yet in any player's pool
-            available_words = [w for w in all_theme_words if w.lower() not in assigned_words]
+            available_words = list(compress(all_theme_words, [wl not in assigned_words for wl in _theme_words_lower(game)]))
             
             # Give the next player a random pool from available (unassigned) words
             if len(available_words) >= WORDS_PER_PLAYER:
@@ -7476,7 +8397,7 @@ class handler(BaseHTTPRequestHandler):
                 if auth_user:
                     stats = get_user_stats(auth_user)
                     mmr = stats.get('mmr', RANKED_INITIAL_MMR)
-                    cosmetics = get_user_cosmetics(auth_user)
+                    cosmetics = get_user_cosmetics(auth_user, persist_changes=False)
             
             # Ranked eligibility check
             if mode == 'ranked':
@@ -7534,8 +8455,6 @@ class handler(BaseHTTPRequestHandler):
             if not check_rate_limit(get_ratelimit_game_create(), client_ip):
                 return self._send_error("Too many game creations. Please wait.", 429)
             
-            import random
-
             # Lobby metadata (defaults tuned for friend-code flow)
             requested_visibility = sanitize_visibility(body.get('visibility', 'private'), default='private')
             requested_ranked = parse_bool(body.get('is_ranked', False), default=False)
@@ -7606,8 +8525,6 @@ class handler(BaseHTTPRequestHandler):
             if not check_rate_limit(get_ratelimit_game_create(), client_ip):
                 return self._send_error("Too many challenge creations. Please wait.", 429)
             
-            import random
-            
             # Get challenger info
             auth_user_id = self._get_auth_user_id()
             challenger_name = body.get('challenger_name', 'Anonymous')
@@ -7680,8 +8597,6 @@ class handler(BaseHTTPRequestHandler):
             
             challenge = json.loads(challenge_data)
             
-            import random
-            
             # Create a new game for this challenge
             code = generate_game_code()
             while load_game(code):
@@ -7729,8 +8644,6 @@ class handler(BaseHTTPRequestHandler):
             if not check_rate_limit(get_ratelimit_game_create(), client_ip):
                 return self._send_error("Too many game creations. Please wait.", 429)
             
-            import random
-            
             code = generate_game_code()
             
             # Make sure code is unique
@@ -8525,8 +9438,6 @@ class handler(BaseHTTPRequestHandler):
                 except Exception:
                     pass
             
-            import random
-            
             # Determine word count (50 for quickplay, 100 for ranked/custom)
             # Default to 100 for backwards compatibility
             word_count = game.get('word_count', 100)
@@ -8675,7 +9586,6 @@ class handler(BaseHTTPRequestHandler):
             # Randomize turn order for multiplayer so the host doesn't always go first.
             # (Singleplayer stays deterministic: the human host starts.)
             if not game.get('is_singleplayer'):
-                import random
                 random.shuffle(game['players'])
                 game['current_turn'] = 0
 
@@ -8694,6 +9604,8 @@ class handler(BaseHTTPRequestHandler):
                 cached_matrix = get_cached_theme_similarity_matrix(theme_name) if theme_name else None
                 if cached_matrix:
                     game['theme_similarity_matrix'] = cached_matrix
+                    # Build (or reuse) the dense view at theme load rather than on the first guess
+                    _theme_sim_index(game)
                 else:
                     # Fallback: compute in background thread (slower, ~100ms)
                     import threading
@@ -8745,8 +9657,6 @@ class handler(BaseHTTPRequestHandler):
                     "message": "Word selection time has not expired yet",
                 })
             
-            import random
-            
             # Auto-assign random words to players who haven't picked
             auto_assigned = []
             for p in game['players']:
@@ -9000,30 +9910,18 @@ class handler(BaseHTTPRequestHandler):
                 return self._send_error("Please select a word from the theme", 400)
             
             # Calculate similarities using pre-computed matrix
-            similarities = {}
-            matrix = game.get('theme_similarity_matrix')
-            
-            if not matrix:
+            if not game.get('theme_similarity_matrix'):
                 return self._send_error("Game not properly initialized", 500)
             
-            for p in game['players']:
-                secret_word = p.get('secret_word')
-                if not secret_word:
-                    continue
-                secret_lower = secret_word.lower()
-                
-                # Use pre-computed similarity matrix (guaranteed to have all theme words)
-                sim = matrix.get(word_lower, {}).get(secret_lower)
-                if sim is not None:
-                    similarities[p['id']] = round(sim, 4)
+            # Use pre-computed similarity matrix (guaranteed to have all theme words)
+            similarities, _ = _guess_similarities(game, word_lower)
             
             # Eliminate players whose exact word was guessed
             eliminations = []
-            for p in game['players']:
+            for p in _players_by_secret(game).get(word_lower, ()):
                 if p['id'] != player_id and p['is_alive']:
-                    if word.lower() == p['secret_word'].lower():
-                        p['is_alive'] = False
-                        eliminations.append(p['id'])
+                    p['is_alive'] = False
+                    eliminations.append(p['id'])
             
             if eliminations:
                 player['can_change_word'] = True
@@ -9314,8 +10212,6 @@ class handler(BaseHTTPRequestHandler):
                     "message": "Word change time has not expired yet",
                 })
             
-            import random
-            
             # Find the player who needs to change their word
             player = None
             for p in game['players']:
@@ -9342,9 +10238,7 @@ class handler(BaseHTTPRequestHandler):
                 available = player.get('word_pool', [])
             
             # Filter out guessed words
-            guessed_words = set()
-            for entry in game.get('history', []):
-                guessed_words.add(entry.get('word', '').lower())
+            guessed_words = _history_word_index(game).all_guessed
             available = [w for w in available if w.lower() not in guessed_words]
             
             if not available: